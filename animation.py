@@ -0,0 +1,99 @@
+# --- Agendador de Animações ---
+# Tweens baseados em tempo, avançados uma vez por quadro pelo loop principal.
+# Nada aqui espera ou desenha: o loop chama timeline.update(agora) e depois
+# desenha o estado que os tweens deixaram.
+
+from collections import deque
+
+
+def lerp(a, b, t):
+    """Interpolação Linear: de 'a' para 'b' em 't' (0.0 a 1.0)"""
+    return a + (b - a) * t
+
+
+class Tween:
+    """
+    Vai de t=0.0 a t=1.0 ao longo de 'duration' milissegundos.
+    on_start() roda quando o tween começa, on_update(t) a cada avanço e
+    on_done() uma vez, no fim. Com duration=0 vira um passo instantâneo.
+    """
+
+    def __init__(self, duration, on_update=None, on_start=None, on_done=None):
+        self.duration = duration
+        self.on_update = on_update
+        self.on_start = on_start
+        self.on_done = on_done
+        self.start_time = None
+
+    def start(self, now):
+        self.start_time = now
+        if self.on_start:
+            self.on_start()
+
+    def update(self, now):
+        """Avança até 'now'. Retorna True quando terminou."""
+        if self.duration <= 0:
+            t = 1.0
+        else:
+            t = min(1.0, (now - self.start_time) / self.duration)
+        if self.on_update:
+            self.on_update(t)
+        if t >= 1.0:
+            if self.on_done:
+                self.on_done()
+            return True
+        return False
+
+
+def wait(duration, on_start=None, on_done=None):
+    """Uma pausa na linha do tempo (ex.: o "flash" verde das combinações)."""
+    return Tween(duration, on_start=on_start, on_done=on_done)
+
+
+def call(func):
+    """Um passo instantâneo que só executa 'func'."""
+    return Tween(0, on_start=func)
+
+
+class Timeline:
+    """
+    Fila de fases. Os tweens de uma mesma fase rodam juntos; a próxima fase
+    começa quando todos os da fase atual terminam. Tweens adicionados com
+    add() rodam em paralelo à fila, sobrepondo-se ao que estiver tocando.
+    """
+
+    def __init__(self):
+        self._phases = deque()
+        self._current = []
+        self._parallel = []
+
+    @property
+    def busy(self):
+        return bool(self._current or self._phases or self._parallel)
+
+    def queue(self, *tweens):
+        """Enfileira uma fase (os tweens dela começam juntos)."""
+        self._phases.append(tweens)
+
+    def add(self, tween, now):
+        """Começa 'tween' imediatamente, em paralelo à fila."""
+        tween.start(now)
+        self._parallel.append(tween)
+
+    def clear(self):
+        self._phases.clear()
+        self._current = []
+        self._parallel = []
+
+    def update(self, now):
+        self._parallel = [tween for tween in self._parallel if not tween.update(now)]
+        while True:
+            if not self._current:
+                if not self._phases:
+                    return
+                self._current = list(self._phases.popleft())
+                for tween in self._current:
+                    tween.start(now)
+            self._current = [tween for tween in self._current if not tween.update(now)]
+            if self._current:
+                return
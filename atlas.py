@@ -0,0 +1,64 @@
+# --- Atlas de Sprites em Disco ---
+# Sprites já rasterizados (peças com número, textos fixos da UI) são
+# empacotados numa única imagem PNG, com um índice JSON ao lado, e relidos na
+# próxima execução: o primeiro quadro não precisa abrir nenhuma fonte.
+# O índice guarda uma chave (versão do pygame, arquivo da fonte, tamanhos...);
+# se ela não bater, o atlas é ignorado e refeito.
+import hashlib
+import io
+import json
+import os
+
+import pygame
+
+from atomicfile import atomic_write
+
+ATLAS_VERSION = 1
+ATLAS_WIDTH = 1024  # Largura máxima da imagem; os sprites vão em prateleiras
+
+
+def default_cache_dir():
+    return (os.environ.get("CALCULOCRUSH_CACHE_DIR")
+            or os.path.join(os.path.expanduser("~"), ".cache", "calculocrush"))
+
+def make_key(*parts):
+    """Chave do atlas: muda se qualquer coisa que afeta os pixels mudar."""
+    return hashlib.sha1(repr((ATLAS_VERSION,) + parts).encode("utf-8")).hexdigest()
+
+def save_atlas(path, key, sprites):
+    """Grava {nome: Surface} em path + '.png' e path + '.json'."""
+    rects = {}
+    x = y = shelf = width = 0
+    for name, surf in sprites.items():
+        w, h = surf.get_size()
+        if x + w > ATLAS_WIDTH and x > 0:
+            x, y, shelf = 0, y + shelf, 0
+        rects[name] = (x, y, w, h)
+        x += w
+        shelf = max(shelf, h)
+        width = max(width, x)
+
+    sheet = pygame.Surface((max(1, width), max(1, y + shelf)), pygame.SRCALPHA)
+    sheet.fill((0, 0, 0, 0))
+    for name, surf in sprites.items():
+        # MAX sobre o fundo zerado copia os pixels sem misturar o alfa
+        sheet.blit(surf, rects[name][:2], special_flags=pygame.BLEND_RGBA_MAX)
+
+    png = io.BytesIO()
+    pygame.image.save(sheet, png, "atlas.png")
+    atomic_write(path + ".png", png.getvalue())
+    atomic_write(path + ".json", json.dumps({"key": key, "rects": rects}))
+
+def load_atlas(path, key):
+    """{nome: Surface} do atlas gravado, ou None se não existir ou estiver velho."""
+    try:
+        with open(path + ".json", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("key") != key:
+            return None
+        sheet = pygame.image.load(path + ".png")
+    except (OSError, ValueError, pygame.error):
+        return None
+    if pygame.display.get_surface():
+        sheet = sheet.convert_alpha()
+    return {name: sheet.subsurface(rect) for name, rect in index["rects"].items()}
@@ -0,0 +1,16 @@
+# --- Gravação Atômica ---
+# Grava num arquivo temporário ao lado do destino e troca com os.replace:
+# quem lê (ou uma execução interrompida no meio) vê o arquivo antigo inteiro
+# ou o novo inteiro, nunca um arquivo pela metade.
+import os
+
+
+def atomic_write(path, data):
+    """Grava 'data' (bytes ou str em UTF-8) em 'path', criando a pasta."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,199 @@
+# --- Benchmarks ---
+# Mede as rotinas quentes da lógica (engine.py) em grades de 8x8 a 128x128
+# e as de desenho (main.py, inclusive o viewport da maratona) numa surface
+# fora da tela, com o driver de vídeo "dummy" do SDL. Exemplos:
+#   python bench.py --save baseline.json
+#   python bench.py --compare baseline.json        # sai com 1 se houver regressão
+#   python bench.py --only find_matches --sizes 8 64
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from bitboard import BitBoard
+from engine import (
+    MoveIndex, apply_swap, create_board, drop_pieces, find_hint, find_matches,
+    is_swap_valid, new_game_rng, refill_board, remove_pieces,
+)
+
+DEFAULT_SIZES = (8, 16, 32, 64, 128)
+MIN_TIME = 0.2  # Segundos mínimos de medição por benchmark
+MIN_RUNS = 5
+
+# --- Medição ---
+def measure(run, prepare=None, min_time=MIN_TIME, min_runs=MIN_RUNS):
+    """
+    Chama run(*prepare()) até juntar 'min_time' segundos e 'min_runs' chamadas.
+    Só o tempo de run entra na conta; prepare monta uma entrada nova a cada vez.
+    """
+    samples = []
+    total = 0.0
+    while total < min_time or len(samples) < min_runs:
+        args = prepare() if prepare else ()
+        start = time.perf_counter()
+        run(*args)
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+    return {
+        "runs": len(samples),
+        "best": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+    }
+
+def stable_board(size, seed=1234):
+    """Tabuleiro sem combinações pendentes (como fica depois de uma cascata)."""
+    _, rng = new_game_rng(seed)
+    board = create_board(size, size, rng=rng)
+    matches = find_matches(board)
+    while matches:
+        remove_pieces(board, matches)
+        drop_pieces(board)
+        refill_board(board, rng=rng)
+        matches = find_matches(board)
+    return board
+
+def copy_board(board):
+    return [list(row) for row in board]
+
+# --- Benchmarks de lógica ---
+# Cada bench_* devolve {nome: (run, prepare)}; run_all só mede os que passam
+# pelo --only, e só monta as entradas de um grupo se algum nome dele passar.
+LOGIC_BENCHMARKS = (
+    "find_matches", "find_hint", "is_swap_valid", "drop_pieces", "refill_board", "cascade",
+    "bitboard_find_matches", "bitboard_find_hint", "bitboard_is_swap_valid",
+    "bitboard_valid_moves",
+)
+DRAW_BENCHMARKS = (
+    "draw_board_static", "draw_board_static[marathon]", "draw_piece", "update_game_surface",
+)
+
+def bench_logic(size):
+    board = stable_board(size)
+    _, rng = new_game_rng(99)
+    hint = MoveIndex(board).hint() or ((0, 0), (0, 1))
+    bitboard = BitBoard.from_board(board)
+    bitboard.valid_swap_masks()  # Aquece o cache de máscaras de borda
+
+    def with_holes():
+        # Esvazia uma casa a cada três, espalhadas pela grade
+        holed = copy_board(board)
+        for r in range(size):
+            for c in range(r % 3, size, 3):
+                holed[r][c] = 0
+        return (holed,)
+
+    def dropped():
+        (holed,) = with_holes()
+        drop_pieces(holed)
+        return (holed,)
+
+    return {
+        "find_matches": (lambda: find_matches(board), None),
+        "find_hint": (lambda: find_hint(board), None),
+        "is_swap_valid": (lambda: is_swap_valid(board, *hint), None),
+        "drop_pieces": (drop_pieces, with_holes),
+        "refill_board": (lambda b: refill_board(b, rng=rng), dropped),
+        "cascade": (lambda b: apply_swap(b, *hint, rng=rng), lambda: (copy_board(board),)),
+        "bitboard_find_matches": (bitboard.find_matches, None),
+        "bitboard_find_hint": (bitboard.find_hint, None),
+        "bitboard_is_swap_valid": (lambda: bitboard.is_swap_valid(*hint), None),
+        "bitboard_valid_moves": (bitboard.valid_moves, None),
+    }
+
+# --- Benchmarks de desenho ---
+def bench_draw():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    import main as game
+
+    board = stable_board(game.GRID_ROWS)
+    surface = pygame.Surface((game.GAME_WIDTH, game.GAME_HEIGHT))
+    # Maratona: só o viewport é desenhado, o custo não deve crescer com a grade
+    marathon = create_board(game.MARATHON_SIZE, game.MARATHON_SIZE, rng=new_game_rng(7)[1])
+    viewport = game.Viewport(game.MARATHON_SIZE, game.MARATHON_SIZE)
+    viewport.reveal(game.MARATHON_SIZE // 2, game.MARATHON_SIZE // 2)
+    return {
+        "draw_board_static": (lambda: game.draw_board_static(surface, board), None),
+        "draw_board_static[marathon]": (
+            lambda: game.draw_board_static(surface, marathon, viewport=viewport), None),
+        "draw_piece": (lambda: game.draw_piece(surface, 12, 40, 200), None),
+        "update_game_surface": (
+            lambda: game.update_game_surface(surface, board, 120, 15, False), None),
+    }
+
+def run_all(sizes, only=None):
+    def wanted(name):
+        return not only or any(o in name for o in only)
+
+    groups = [({f"{name}[{size}x{size}]": name for name in LOGIC_BENCHMARKS},
+               lambda size=size: bench_logic(size)) for size in sizes]
+    groups.append(({name: name for name in DRAW_BENCHMARKS}, bench_draw))
+    results = {}
+    for names, setup in groups:
+        selected = [key for key in names if wanted(key)]
+        if not selected:
+            continue
+        benchmarks = setup()
+        for key in selected:
+            results[key] = measure(*benchmarks[names[key]])
+    return results
+
+# --- Comparação ---
+def compare(results, baseline, threshold):
+    """Imprime a razão atual/baseline (mediana) e devolve as regressões."""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:>32}: {stats['median'] * 1e6:12.1f} us  (sem baseline)")
+            continue
+        ratio = stats["median"] / base["median"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSÃO"
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  melhorou"
+        print(f"{name:>32}: {stats['median'] * 1e6:12.1f} us  x{ratio:5.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do CalculoCrush")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--only", nargs="+", help="filtra benchmarks pelo nome")
+    parser.add_argument("--save", help="grava os resultados em JSON")
+    parser.add_argument("--compare", help="JSON de baseline para comparar")
+    parser.add_argument("--threshold", type=float, default=1.10,
+                        help="razão acima da qual conta como regressão")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.sizes, args.only)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        return 1 if compare(results, baseline, args.threshold) else 0
+
+    for name, stats in results.items():
+        print(f"{name:>32}: {stats['median'] * 1e6:12.1f} us  ({stats['runs']} execuções)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# --- Bitboard ---
+# Representação compacta do tabuleiro para a regra a*b == c.
+# O conjunto de valores é pequeno e fixo (os da distribuição da partida), então
+# cada valor vira um código de 1 byte, e uma tabela de produtos pré-calculada diz
+# qual código c fecha a trinca para cada par (a, b). O tabuleiro guarda:
+#   - 'cells': um bytearray com o código de cada casa (1 byte por casa);
+#   - 'masks': para cada código, um inteiro com um bit por casa que o contém.
+# Com isso a busca de combinações vira alguns ANDs e shifts por par (a, b)
+# válido, e a checagem de uma troca vira meia dúzia de consultas à tabela.
+# O HintWorker (hints.py) usa o BitBoard nas grades grandes, com um Codec da
+# distribuição da partida: DEFAULT_CODEC só conhece os valores de
+# EASY_NUMBERS_LIST, e os níveis têm outros (produtos até 81).
+
+from engine import EASY_NUMBERS_LIST
+
+
+class Codec:
+    """Códigos dos valores e tabela de produtos para um conjunto de números."""
+
+    def __init__(self, values):
+        self.values = (0,) + tuple(sorted(set(values)))  # Código 0 = casa vazia
+        if len(self.values) > 256:
+            raise ValueError("valores demais para caber em um byte")
+        self.code = {value: code for code, value in enumerate(self.values)}
+        size = len(self.values)
+        self.size = size
+        # product[a * size + b] = código de a*b (0 se o produto não existe)
+        self.product = bytearray(size * size)
+        self.pairs = []  # (a, b, c) com a*b == c, todos códigos não vazios
+        for a in range(1, size):
+            for b in range(1, size):
+                c = self.code.get(self.values[a] * self.values[b], 0)
+                self.product[a * size + b] = c
+                if c:
+                    self.pairs.append((a, b, c))
+
+    def encode(self, value):
+        try:
+            return self.code[value]
+        except KeyError:
+            raise ValueError(f"valor {value} fora do conjunto do codec") from None
+
+    def matches(self, a, b, c):
+        """A trinca de códigos (a, b, c) combina?"""
+        return a != 0 and c != 0 and self.product[a * self.size + b] == c
+
+
+DEFAULT_CODEC = Codec(EASY_NUMBERS_LIST)
+
+
+class BitBoard:
+    """Tabuleiro em bytearray + máscaras de bits por código."""
+
+    def __init__(self, rows, cols, codec=DEFAULT_CODEC):
+        self.rows = rows
+        self.cols = cols
+        self.codec = codec
+        self.cells = bytearray(rows * cols)
+        self.masks = [0] * codec.size
+        self.masks[0] = (1 << (rows * cols)) - 1
+        # Casas onde uma trinca horizontal/vertical pode começar
+        row_starts = (1 << max(0, cols - 2)) - 1
+        self.h_starts = 0
+        for r in range(rows):
+            self.h_starts |= row_starts << (r * cols)
+        self.v_starts = (1 << max(0, (rows - 2) * cols)) - 1
+        self._layout_cache = {}
+
+    @classmethod
+    def from_board(cls, board, codec=DEFAULT_CODEC):
+        bitboard = cls(len(board), len(board[0]), codec)
+        for r, row in enumerate(board):
+            for c, value in enumerate(row):
+                bitboard.set(r, c, value)
+        return bitboard
+
+    def to_board(self):
+        values = self.codec.values
+        return [[values[code] for code in self.cells[r * self.cols:(r + 1) * self.cols]]
+                for r in range(self.rows)]
+
+    # --- Acesso ---
+    def get(self, r, c):
+        return self.codec.values[self.cells[r * self.cols + c]]
+
+    def set(self, r, c, value):
+        i = r * self.cols + c
+        old = self.cells[i]
+        new = self.codec.encode(value)
+        if old != new:
+            bit = 1 << i
+            self.masks[old] &= ~bit
+            self.masks[new] |= bit
+            self.cells[i] = new
+
+    def swap(self, pos1, pos2):
+        v1 = self.get(*pos1)
+        self.set(*pos1, self.get(*pos2))
+        self.set(*pos2, v1)
+
+    # --- Combinações ---
+    def match_mask(self):
+        """Inteiro com um bit ligado para cada casa em alguma trinca."""
+        masks = self.masks
+        cols = self.cols
+        h = v = 0
+        for a, b, c in self.codec.pairs:
+            ma = masks[a]
+            if not ma:
+                continue
+            h |= ma & (masks[b] >> 1) & (masks[c] >> 2)
+            v |= ma & (masks[b] >> cols) & (masks[c] >> (2 * cols))
+        h &= self.h_starts
+        v &= self.v_starts
+        return h | (h << 1) | (h << 2) | v | (v << cols) | (v << (2 * cols))
+
+    def find_matches(self):
+        """Mesmo resultado de engine.find_matches (conjunto de (linha, coluna))."""
+        # bin() invertido tem o bit 0 primeiro; str.find pula os zeros em C
+        bits = bin(self.match_mask())[:1:-1]
+        cols = self.cols
+        matches = set()
+        i = bits.find("1")
+        while i != -1:
+            matches.add(divmod(i, cols))
+            i = bits.find("1", i + 1)
+        return matches
+
+    def _cell_makes_match(self, r, c):
+        """Alguma trinca que passa por (r, c) combina?"""
+        rows, cols = self.rows, self.cols
+        cells = self.cells
+        product = self.codec.product
+        size = self.codec.size
+        for start in range(max(0, c - 2), min(c, cols - 3) + 1):
+            i = r * cols + start
+            a = cells[i]; c_val = cells[i + 2]
+            if a and c_val and product[a * size + cells[i + 1]] == c_val:
+                return True
+        for start in range(max(0, r - 2), min(r, rows - 3) + 1):
+            i = start * cols + c
+            a = cells[i]; c_val = cells[i + 2 * cols]
+            if a and c_val and product[a * size + cells[i + cols]] == c_val:
+                return True
+        return False
+
+    def is_swap_valid(self, pos1, pos2):
+        """
+        Troca válida? Só troca dois bytes, consulta a tabela de produtos e
+        desfaz; as máscaras nem são tocadas.
+        """
+        cells = self.cells
+        i1 = pos1[0] * self.cols + pos1[1]
+        i2 = pos2[0] * self.cols + pos2[1]
+        cells[i1], cells[i2] = cells[i2], cells[i1]
+        valid = (self._cell_makes_match(pos1[0], pos1[1])
+                 or self._cell_makes_match(pos2[0], pos2[1]))
+        cells[i1], cells[i2] = cells[i2], cells[i1]
+        return valid
+
+    # --- Todas as trocas de uma vez ---
+    def _swap_layouts(self, partner):
+        """
+        Para trocas entre a casa base (0, 0) e 'partner' ((0, 1) ou (1, 0)):
+        lista de (máscara de bases válidas, deslocamentos de origem das 3 casas)
+        para cada trinca que passa por uma das duas casas. O deslocamento já
+        considera a troca: a casa base lê o valor do parceiro e vice-versa.
+        """
+        key = ("layouts", partner)
+        cached = self._layout_cache.get(key)
+        if cached is not None:
+            return cached
+        rows, cols = self.rows, self.cols
+        triples = set()
+        for xr, xc in ((0, 0), partner):
+            for d in range(3):
+                triples.add(((xr, xc - d), (xr, xc - d + 1), (xr, xc - d + 2)))
+                triples.add(((xr - d, xc), (xr - d + 1, xc), (xr - d + 2, xc)))
+        swapped = {(0, 0): partner, partner: (0, 0)}
+        layouts = []
+        for triple in sorted(triples):
+            cells = triple + (partner, (0, 0))
+            # Bases (r, c) em que todas as casas ficam dentro da grade
+            r0 = -min(dr for dr, _ in cells); r1 = rows - 1 - max(dr for dr, _ in cells)
+            c0 = -min(dc for _, dc in cells); c1 = cols - 1 - max(dc for _, dc in cells)
+            bound = 0
+            if r0 <= r1 and c0 <= c1:
+                row_bits = ((1 << (c1 - c0 + 1)) - 1) << c0
+                for r in range(r0, r1 + 1):
+                    bound |= row_bits << (r * cols)
+            offsets = tuple(dr * cols + dc for dr, dc in
+                            (swapped.get(cell, cell) for cell in triple))
+            layouts.append((bound, offsets))
+        self._layout_cache[key] = layouts
+        return layouts
+
+    def valid_swap_masks(self):
+        """
+        (direita, baixo): bit i ligado se trocar a casa i com a da direita
+        (ou a de baixo) forma alguma trinca. Tudo em operações de bits: o
+        custo quase não cresce com a grade, então compensa nas grandes (em 8x8
+        o laço simples de engine.find_hint ainda é mais rápido).
+        """
+        masks = self.masks
+        shifted = {}
+
+        def at(code, offset):
+            # Bit i ligado se a casa i + offset tem 'code'
+            key = (code, offset)
+            value = shifted.get(key)
+            if value is None:
+                m = masks[code]
+                value = m >> offset if offset >= 0 else m << -offset
+                shifted[key] = value
+            return value
+
+        result = []
+        for partner in ((0, 1), (1, 0)):
+            valid = 0
+            for bound, (oa, ob, oc) in self._swap_layouts(partner):
+                hits = 0
+                for a, b, c in self.codec.pairs:
+                    if masks[a] and masks[c]:
+                        hits |= at(a, oa) & at(b, ob) & at(c, oc)
+                valid |= hits & bound
+            result.append(valid)
+        return tuple(result)
+
+    def valid_moves(self):
+        """Lista ordenada de todas as trocas válidas ((r, c), vizinho)."""
+        right, down = self.valid_swap_masks()
+        cols = self.cols
+        moves = []
+        for mask, (dr, dc) in ((right, (0, 1)), (down, (1, 0))):
+            bits = bin(mask)[:1:-1]
+            i = bits.find("1")
+            while i != -1:
+                r, c = divmod(i, cols)
+                moves.append(((r, c), (r + dr, c + dc)))
+                i = bits.find("1", i + 1)
+        return sorted(moves)
+
+    def has_moves(self):
+        return any(self.valid_swap_masks())
+
+    def find_hint(self):
+        """Primeira troca válida, na mesma ordem de engine.find_hint."""
+        right, down = self.valid_swap_masks()
+        either = right | down
+        if not either:
+            return None
+        i = (either & -either).bit_length() - 1
+        r, c = divmod(i, self.cols)
+        # Na mesma casa, engine.find_hint testa a direita antes de baixo
+        if right >> i & 1:
+            return ((r, c), (r, c + 1))
+        return ((r, c), (r + 1, c))
@@ -0,0 +1,579 @@
+# --- Motor de Jogo (sem pygame) ---
+# Toda a lógica do tabuleiro fica aqui para poder ser usada sem abrir
+# janela: no jogo (main.py), no simulador em lote (simulate.py) e em testes.
+import random
+import os
+from collections import namedtuple
+
+from refill import AVOID_MATCHES, RandomRefill
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: só o ArrayBoard depende dele
+    np = None
+
+# Tamanho padrão da grade
+GRID_ROWS = 8
+GRID_COLS = 8
+
+# Configurações do Nível 1
+STARTING_MOVES = 20
+TARGET_SCORE = 300
+REFILL_STRATEGY = "random"  # Chave de refill.REFILL_STRATEGIES
+
+# Lista de números fáceis
+EASY_NUMBERS_LIST = (
+    [1, 2, 3] * 15 + [4, 5] * 7 + [6, 7, 8, 9] * 4 +
+    [4, 6, 8, 9, 10, 12, 15, 16, 18, 20, 24, 25, 36] * 2
+)
+
+# Modo de verificação: compara a busca incremental de combinações com a
+# varredura completa (CALCULOCRUSH_CHECK_MATCHES=1 para ligar)
+CHECK_INCREMENTAL_MATCHES = os.environ.get("CALCULOCRUSH_CHECK_MATCHES") == "1"
+
+# --- Sorteio Determinístico ---
+# Cada partida tem seu próprio gerador (random.Random) criado a partir de uma
+# semente. Com a mesma semente e as mesmas trocas, a partida se repete igual.
+def new_game_rng(seed=None):
+    """Retorna (semente, gerador). Sem semente, sorteia uma nova."""
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    return seed, random.Random(seed)
+
+# --- Funções de Lógica ---
+# Acima deste tamanho o tabuleiro já nasce assentado (sem trinca pronta): um
+# 200x200 sorteado ao acaso traz milhares de combinações, e a primeira troca
+# as resolveria todas de uma vez, em vários segundos.
+SETTLED_BOARD_CELLS = 32 * 32
+
+def create_board(rows, cols, numbers=None, rng=None):
+    numbers = numbers or EASY_NUMBERS_LIST
+    rng = rng or random
+    if rows * cols > SETTLED_BOARD_CELLS:
+        board = [[0] * cols for _ in range(rows)]
+        refill_board(board, numbers, rng, AVOID_MATCHES)
+        return board
+    board = []
+    for row in range(rows):
+        board.append([])
+        for col in range(cols):
+            board[row].append(rng.choice(numbers))
+    return board
+
+def swap_pieces(board, pos1, pos2):
+    r1, c1 = pos1
+    r2, c2 = pos2
+    board[r1][c1], board[r2][c2] = board[r2][c2], board[r1][c1]
+
+def find_matches(board):
+    if isinstance(board, ArrayBoard):
+        return board.find_matches()
+    matches = set()
+    rows = len(board); cols = len(board[0])
+    # Horizontal
+    for r in range(rows):
+        for c in range(cols - 2):
+            a = board[r][c]; b = board[r][c+1]; c_val = board[r][c+2]
+            if a > 0 and b > 0 and a * b == c_val:
+                matches.update([(r, c), (r, c+1), (r, c+2)])
+    # Vertical
+    for c in range(cols):
+        for r in range(rows - 2):
+            a = board[r][c]; b = board[r+1][c]; c_val = board[r+2][c]
+            if a > 0 and b > 0 and a * b == c_val:
+                matches.update([(r, c), (r+1, c), (r+2, c)])
+    return matches
+
+def find_matches_incremental(board, changed_cells):
+    """
+    Versão incremental de find_matches: reavalia só as trincas que passam
+    por alguma célula de 'changed_cells'.
+    Pressupõe que o tabuleiro estava estável (sem combinações) antes da
+    mudança, que é o caso depois de uma troca ou de um passo de cascata.
+    Combinações que não passam por 'changed_cells' não entram: num tabuleiro
+    recém-criado, uma trinca antiga não torna válida uma troca qualquer.
+    """
+    rows = len(board); cols = len(board[0])
+    h_starts = set()
+    v_starts = set()
+    for r, c in changed_cells:
+        for start in range(max(0, c - 2), min(c, cols - 3) + 1):
+            h_starts.add((r, start))
+        for start in range(max(0, r - 2), min(r, rows - 3) + 1):
+            v_starts.add((start, c))
+
+    matches = set()
+    # Horizontal
+    for r, c in h_starts:
+        row = board[r]
+        a = row[c]; b = row[c+1]; c_val = row[c+2]
+        if a > 0 and b > 0 and a * b == c_val:
+            matches.update([(r, c), (r, c+1), (r, c+2)])
+    # Vertical
+    for r, c in v_starts:
+        a = board[r][c]; b = board[r+1][c]; c_val = board[r+2][c]
+        if a > 0 and b > 0 and a * b == c_val:
+            matches.update([(r, c), (r+1, c), (r+2, c)])
+
+    if CHECK_INCREMENTAL_MATCHES:
+        expected = _full_scan_through(board, changed_cells)
+        if matches != expected:
+            raise AssertionError(
+                f"find_matches_incremental divergiu da varredura completa: "
+                f"faltando {sorted(expected - matches)}, "
+                f"sobrando {sorted(matches - expected)}"
+            )
+    return matches
+
+def _full_scan_through(board, changed_cells):
+    """
+    Referência do modo de verificação: varre todas as trincas do tabuleiro,
+    mas só guarda as que passam por 'changed_cells'. Combinações antigas em
+    outras casas (tabuleiro recém-criado, por exemplo) não contam.
+    """
+    changed = set(changed_cells)
+    matches = set()
+    rows = len(board); cols = len(board[0])
+    for r in range(rows):
+        for c in range(cols):
+            for triple in (((r, c), (r, c+1), (r, c+2)), ((r, c), (r+1, c), (r+2, c))):
+                (r1, c1), (r2, c2), (r3, c3) = triple
+                if r3 >= rows or c3 >= cols or changed.isdisjoint(triple):
+                    continue
+                a = board[r1][c1]; b = board[r2][c2]
+                if a > 0 and b > 0 and a * b == board[r3][c3]:
+                    matches.update(triple)
+    return matches
+
+def cells_changed_by_refill(falling_moves, new_pieces):
+    """
+    Células alteradas por drop_pieces + refill_board.
+    Toda casa esvaziada termina ou como destino de uma queda ou como peça
+    nova, então basta juntar esses dois conjuntos.
+    """
+    changed = {to_pos for _, _, to_pos in falling_moves}
+    changed.update(pos for _, pos in new_pieces)
+    return changed
+
+def find_matches_after_refill(board, falling_moves, new_pieces):
+    """Reavalia só as trincas tocadas pela saída de drop_pieces/refill_board."""
+    return find_matches_incremental(
+        board, cells_changed_by_refill(falling_moves, new_pieces))
+
+def find_hint(board):
+    rows = len(board); cols = len(board[0])
+    for r in range(rows):
+        for c in range(cols):
+            # Direita
+            if c < cols - 1:
+                pos1 = (r, c); pos2 = (r, c + 1)
+                swap_pieces(board, pos1, pos2)
+                matches = find_matches_incremental(board, (pos1, pos2))
+                swap_pieces(board, pos1, pos2)
+                if matches: return (pos1, pos2)
+            # Baixo
+            if r < rows - 1:
+                pos1 = (r, c); pos2 = (r + 1, c)
+                swap_pieces(board, pos1, pos2)
+                matches = find_matches_incremental(board, (pos1, pos2))
+                swap_pieces(board, pos1, pos2)
+                if matches: return (pos1, pos2)
+    return None
+
+def remove_pieces(board, matches):
+    if isinstance(board, ArrayBoard):
+        return board.remove_pieces(matches)
+    score_gain = 0
+    for r, c in matches:
+        number = board[r][c]
+        if number > 0:
+            score_gain += number 
+            board[r][c] = 0
+    return score_gain
+
+def drop_pieces(board, columns=None):
+    """
+    Deixa as peças caírem sobre os buracos. 'columns' limita a passada às
+    colunas que podem ter buracos (as das casas removidas); a ordem das
+    quedas é a mesma da passada completa.
+    """
+    if isinstance(board, ArrayBoard):
+        return board.drop_pieces()
+    rows = len(board)
+    moves = []
+    for c in (range(len(board[0])) if columns is None else sorted(columns)):
+        drop_to_row = rows - 1
+        for r in range(rows - 1, -1, -1):
+            if board[r][c] > 0:
+                number = board[r][c]
+                if r != drop_to_row:
+                    moves.append((number, (r, c), (drop_to_row, c)))
+                    board[drop_to_row][c] = number
+                    board[r][c] = 0
+                drop_to_row -= 1
+    return moves
+
+def refill_board(board, numbers=None, rng=None, strategy=None, columns=None):
+    """
+    Preenche as casas vazias em ordem de leitura. 'strategy' (de refill.py)
+    escolhe cada peça olhando os vizinhos já preenchidos; sem ela, é o
+    sorteio simples da distribuição. 'columns' limita a busca de casas
+    vazias a essas colunas; a ordem de leitura (e o sorteio) não muda.
+    """
+    if isinstance(board, ArrayBoard):
+        # Sorteio em lote: só vale a estratégia de sorteio simples
+        if strategy is not None and not isinstance(strategy, RandomRefill):
+            raise ValueError("ArrayBoard só repõe com sorteio simples (sem estratégia)")
+        return board.refill_board(numbers, rng)
+    numbers = numbers or EASY_NUMBERS_LIST
+    rng = rng or random
+    rows = len(board); cols = len(board[0])
+    if columns is None:
+        empty = ((r, c) for r in range(rows) for c in range(cols) if board[r][c] == 0)
+    else:
+        empty = sorted((r, c) for c in columns for r in range(rows) if board[r][c] == 0)
+    new_pieces = []
+    for r, c in empty:
+        if strategy is None:
+            number = rng.choice(numbers)
+        else:
+            number = strategy.pick(board, r, c, numbers, rng)
+        board[r][c] = number
+        new_pieces.append((number, (r, c)))
+    return new_pieces
+
+def is_swap_valid(board, pos1, pos2):
+    swap_pieces(board, pos1, pos2)
+    matches = find_matches_incremental(board, (pos1, pos2))
+    swap_pieces(board, pos1, pos2)
+    return len(matches) > 0
+
+# --- Embaralhar (tabuleiro sem jogadas) ---
+PLANT_ATTEMPTS = 100
+
+def shuffle_board(board, numbers=None, rng=None, max_attempts=PLANT_ATTEMPTS):
+    """
+    Refaz o tabuleiro travado sem sortear-e-rejeitar: as peças são sorteadas
+    casa a casa pela estratégia AVOID_MATCHES (nenhuma trinca pronta, por
+    construção) e depois uma jogada válida é plantada num lugar sorteado.
+    Custo limitado: uma passada pelo tabuleiro e até 'max_attempts' tentativas
+    de plantio, cada uma olhando só as 3 casas mexidas. Retorna False se o
+    tabuleiro ficou sem jogadas (distribuição sem nenhum produto).
+    """
+    numbers = numbers or EASY_NUMBERS_LIST
+    rng = rng or random
+    for row in board:
+        for c in range(len(row)):
+            row[c] = 0
+    refill_board(board, numbers, rng, AVOID_MATCHES)
+    table = AVOID_MATCHES.table(numbers)
+    for _ in range(max_attempts):
+        if table.triples and _plant_move(board, table, rng):
+            return True
+    return find_hint(board) is not None
+
+def _plant_move(board, table, rng):
+    """
+    Põe a, b numa linha (ou coluna) e c ao lado da terceira casa, de modo que
+    trocar c para dentro feche a*b == c. Desfaz se o plantio formou uma
+    trinca pronta. Retorna True se plantou.
+    """
+    rows = len(board); cols = len(board[0])
+    a, b, c = rng.choice(table.triples)
+    if rng.random() < 0.5:
+        # Horizontal: a b _ na linha r, c acima ou abaixo da casa vazia
+        if cols < 3 or rows < 2:
+            return False
+        r = rng.randrange(rows); col = rng.randrange(cols - 2)
+        side = r + 1 if r + 1 < rows and (r == 0 or rng.random() < 0.5) else r - 1
+        cells = ((r, col), (r, col + 1), (side, col + 2))
+    else:
+        # Vertical: a b _ na coluna, c à esquerda ou à direita da casa vazia
+        if rows < 3 or cols < 2:
+            return False
+        r = rng.randrange(rows - 2); col = rng.randrange(cols)
+        side = col + 1 if col + 1 < cols and (col == 0 or rng.random() < 0.5) else col - 1
+        cells = ((r, col), (r + 1, col), (r + 2, side))
+    old = [board[pr][pc] for pr, pc in cells]
+    for (pr, pc), value in zip(cells, (a, b, c)):
+        board[pr][pc] = value
+    if not find_matches_incremental(board, cells):
+        return True
+    for (pr, pc), value in zip(cells, old):
+        board[pr][pc] = value
+    return False
+
+# --- Índice de Jogadas Válidas ---
+class MoveIndex:
+    """
+    Mantém o conjunto de todas as trocas válidas do tabuleiro.
+    Depois de trocas, quedas e reposições, basta avisar quais casas mudaram
+    (mark_changed); só as trocas num raio de 2 casas delas são reavaliadas,
+    na próxima consulta. Dica, validação de troca e "sem jogadas" viram
+    consultas ao conjunto.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.moves = set()
+        self._dirty = set()
+        self.rebuild()
+
+    @staticmethod
+    def _key(pos1, pos2):
+        return (pos1, pos2) if pos1 < pos2 else (pos2, pos1)
+
+    def _check(self, pos1, pos2):
+        if is_swap_valid(self.board, pos1, pos2):
+            self.moves.add((pos1, pos2))
+        else:
+            self.moves.discard((pos1, pos2))
+
+    def rebuild(self):
+        """Reavalia todas as trocas (usado na criação e após embaralhar)."""
+        rows = len(self.board); cols = len(self.board[0])
+        self.moves.clear()
+        self._dirty.clear()
+        for r in range(rows):
+            for c in range(cols):
+                if c < cols - 1:
+                    self._check((r, c), (r, c + 1))
+                if r < rows - 1:
+                    self._check((r, c), (r + 1, c))
+
+    def mark_changed(self, cells):
+        self._dirty.update(cells)
+
+    def _refresh(self):
+        if not self._dirty:
+            return
+        rows = len(self.board); cols = len(self.board[0])
+        # Uma troca (p, q) só depende das casas nas trincas que passam por
+        # p ou q, ou seja, da "cruz" de raio 2 ao redor de cada uma.
+        origins = set()
+        for r, c in self._dirty:
+            for d in range(-2, 3):
+                origins.add((r + d, c))
+                origins.add((r, c + d))
+        pairs = set()
+        for r, c in origins:
+            if not (0 <= r < rows and 0 <= c < cols):
+                continue
+            if c < cols - 1: pairs.add(((r, c), (r, c + 1)))
+            if c > 0: pairs.add(((r, c - 1), (r, c)))
+            if r < rows - 1: pairs.add(((r, c), (r + 1, c)))
+            if r > 0: pairs.add(((r - 1, c), (r, c)))
+        for pos1, pos2 in pairs:
+            self._check(pos1, pos2)
+        self._dirty.clear()
+
+    # --- Consultas ---
+    def is_valid(self, pos1, pos2):
+        self._refresh()
+        return self._key(pos1, pos2) in self.moves
+
+    def has_moves(self):
+        self._refresh()
+        return bool(self.moves)
+
+    def hint(self):
+        """Uma troca válida qualquer, ou None (mesmo formato de find_hint)."""
+        self._refresh()
+        return next(iter(self.moves), None)
+
+    def valid_moves(self):
+        """Lista completa (ordenada) das trocas válidas."""
+        self._refresh()
+        return sorted(self.moves)
+
+# --- Tabuleiro NumPy (opcional) ---
+class ArrayBoard:
+    """
+    Tabuleiro guardado num array 2D de inteiros (NumPy).
+    Combinações, queda e reposição são feitas com operações vetorizadas.
+    Também se comporta como a lista de listas (board[r][c], len(board),
+    iteração por linhas), então as funções antigas continuam funcionando
+    com ele: find_matches, remove_pieces, drop_pieces e refill_board
+    delegam para os métodos vetorizados.
+    'rng' é um np.random.Generator ou um random.Random (do qual sai a
+    semente de um Generator) e 'numbers' a distribuição das peças novas.
+    """
+
+    def __init__(self, cells, rng=None, numbers=None):
+        if np is None:
+            raise ImportError("ArrayBoard precisa do NumPy instalado")
+        self.cells = np.array(cells, dtype=np.int64)
+        self.rng = _numpy_rng(rng) if rng is not None else np.random.default_rng()
+        self._numbers = np.array(numbers or EASY_NUMBERS_LIST, dtype=np.int64)
+
+    @classmethod
+    def random(cls, rows, cols, seed=None, numbers=None):
+        if np is None:
+            raise ImportError("ArrayBoard precisa do NumPy instalado")
+        rng = np.random.default_rng(seed)
+        board = cls(np.zeros((rows, cols)), rng, numbers)
+        board.cells = rng.choice(board._numbers, size=(rows, cols))
+        return board
+
+    # --- Adaptador para o formato lista de listas ---
+    def __len__(self):
+        return self.cells.shape[0]
+
+    def __getitem__(self, row):
+        return self.cells[row]
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def to_list(self):
+        return self.cells.tolist()
+
+    # --- Operações vetorizadas ---
+    def match_mask(self):
+        """Máscara booleana das casas que fazem parte de alguma trinca a*b==c."""
+        cells = self.cells
+        mask = np.zeros(cells.shape, dtype=bool)
+        # Horizontal: produtos de fatias deslocadas
+        a = cells[:, :-2]; b = cells[:, 1:-1]; c_val = cells[:, 2:]
+        hit = (a > 0) & (b > 0) & (a * b == c_val)
+        mask[:, :-2] |= hit; mask[:, 1:-1] |= hit; mask[:, 2:] |= hit
+        # Vertical
+        a = cells[:-2, :]; b = cells[1:-1, :]; c_val = cells[2:, :]
+        hit = (a > 0) & (b > 0) & (a * b == c_val)
+        mask[:-2, :] |= hit; mask[1:-1, :] |= hit; mask[2:, :] |= hit
+        return mask
+
+    def find_matches(self):
+        rows, cols = np.nonzero(self.match_mask())
+        return set(zip(rows.tolist(), cols.tolist()))
+
+    def remove_pieces(self, matches):
+        if isinstance(matches, np.ndarray):
+            mask = matches
+        else:
+            mask = np.zeros(self.cells.shape, dtype=bool)
+            if matches:
+                rows, cols = zip(*matches)
+                mask[list(rows), list(cols)] = True
+        mask = mask & (self.cells > 0)
+        score_gain = int(self.cells[mask].sum())
+        self.cells[mask] = 0
+        return score_gain
+
+    def drop_pieces(self):
+        """Compacta cada coluna para baixo com um argsort estável."""
+        cells = self.cells
+        rows = cells.shape[0]
+        # Buracos (chave 0) vão para cima, peças (chave 1) para baixo,
+        # mantendo a ordem relativa dentro de cada coluna.
+        order = np.argsort(cells > 0, axis=0, kind="stable")
+        dropped = np.take_along_axis(cells, order, axis=0)
+
+        moved = (dropped > 0) & (order != np.arange(rows)[:, None])
+        to_rows, to_cols = np.nonzero(moved)
+        # Mesma ordem de drop_pieces: coluna a coluna, de baixo para cima
+        sort = np.lexsort((-to_rows, to_cols))
+        to_rows = to_rows[sort]; to_cols = to_cols[sort]
+        from_rows = order[to_rows, to_cols]
+        numbers = dropped[to_rows, to_cols]
+
+        self.cells = dropped
+        return [(n, (fr, c), (tr, c)) for n, fr, tr, c in zip(
+            numbers.tolist(), from_rows.tolist(), to_rows.tolist(), to_cols.tolist())]
+
+    def refill_board(self, numbers=None, rng=None):
+        """
+        Preenche todos os buracos com um único sorteio em lote. 'numbers' e
+        'rng' trocam, só nesta chamada, a distribuição e o gerador.
+        """
+        holes = self.cells == 0
+        count = int(holes.sum())
+        if count == 0:
+            return []
+        values = self._numbers if numbers is None else np.array(numbers, dtype=np.int64)
+        generator = self.rng if rng is None else _numpy_rng(rng)
+        numbers = generator.choice(values, size=count)
+        self.cells[holes] = numbers
+        rows, cols = np.nonzero(holes)
+        return [(n, (r, c)) for n, r, c in zip(
+            numbers.tolist(), rows.tolist(), cols.tolist())]
+
+def _numpy_rng(rng):
+    """Generator do NumPy para 'rng' (um Generator, ou um random.Random/random)."""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    # Uma semente tirada do gerador da partida: a mesma partida, o mesmo sorteio
+    return np.random.default_rng(rng.getrandbits(64))
+
+# --- Cascata sem animação ---
+# A cascata é resolvida numa passada só, direto no tabuleiro (sem cópias por
+# passo), e vira uma linha do tempo compacta de eventos. Quem tiver o
+# tabuleiro de antes reconstrói cada passo com apply_cascade_step: a animação
+# do main.py, o replay, o simulador e o servidor consomem o mesmo formato.
+CascadeStep = namedtuple("CascadeStep", "matches score_gain falling_moves new_pieces")
+# matches:       casas removidas (conjunto de (linha, coluna))
+# score_gain:    pontos do passo (remove_pieces)
+# falling_moves: (número, origem, destino) de cada peça que caiu
+# new_pieces:    (número, casa) de cada peça nova
+
+def resolve_cascade_events(board, matches, move_index=None, numbers=None, rng=None,
+                           strategy=None):
+    """
+    Resolve a cascata inteira a partir de 'matches' e devolve a lista de
+    CascadeStep. 'numbers' troca a distribuição de peças novas (padrão:
+    EASY_NUMBERS_LIST), 'rng' o gerador usado no sorteio (padrão: random) e
+    'strategy' a estratégia de reposição (padrão: sorteio simples).
+    """
+    steps = []
+    while matches:
+        score_gain = remove_pieces(board, matches)
+        # Só as colunas das casas removidas ganham buracos
+        columns = {c for _, c in matches}
+        falling_moves = drop_pieces(board, columns)
+        new_pieces = refill_board(board, numbers, rng, strategy, columns)
+        changed = cells_changed_by_refill(falling_moves, new_pieces)
+        if move_index is not None:
+            move_index.mark_changed(changed)
+        steps.append(CascadeStep(matches, score_gain, falling_moves, new_pieces))
+        matches = find_matches_incremental(board, changed)
+    return steps
+
+def apply_cascade_step(board, step):
+    """Leva 'board' do início ao fim de um passo (o inverso de guardar cópias)."""
+    for r, c in step.matches:
+        board[r][c] = 0
+    for _, (r, c), _ in step.falling_moves:
+        board[r][c] = 0
+    for number, _, (r, c) in step.falling_moves:
+        board[r][c] = number
+    for number, (r, c) in step.new_pieces:
+        board[r][c] = number
+
+def resolve_cascade(board, matches, move_index=None, numbers=None, rng=None,
+                    strategy=None):
+    """Como resolve_cascade_events, mas só devolve (pontos ganhos, profundidade)."""
+    steps = resolve_cascade_events(board, matches, move_index, numbers, rng, strategy)
+    return sum(step.score_gain for step in steps), len(steps)
+
+def apply_swap_events(board, pos1, pos2, move_index=None, numbers=None, rng=None,
+                      strategy=None):
+    """
+    Aplica uma troca já validada e resolve a cascata, com as mesmas regras do
+    jogo (a primeira busca é completa e também limpa combinações que vieram
+    no tabuleiro inicial; acima de SETTLED_BOARD_CELLS o tabuleiro nasce
+    assentado e basta olhar as casas trocadas). Retorna a linha do tempo (lista de CascadeStep).
+    """
+    swap_pieces(board, pos1, pos2)
+    if move_index is not None:
+        move_index.mark_changed((pos1, pos2))
+    if not isinstance(board, ArrayBoard) and len(board) * len(board[0]) > SETTLED_BOARD_CELLS:
+        # Tabuleiro grande nasce assentado: só a troca pode ter formado trincas
+        matches = find_matches_incremental(board, (pos1, pos2))
+    else:
+        matches = find_matches(board)
+    return resolve_cascade_events(board, matches, move_index, numbers, rng, strategy)
+
+def apply_swap(board, pos1, pos2, move_index=None, numbers=None, rng=None, strategy=None):
+    """Como apply_swap_events, mas só devolve (pontos ganhos, profundidade)."""
+    steps = apply_swap_events(board, pos1, pos2, move_index, numbers, rng, strategy)
+    return sum(step.score_gain for step in steps), len(steps)
@@ -0,0 +1,75 @@
+# --- Entrada (gestos de troca) ---
+# O loop lê a fila de eventos uma vez por quadro; aqui ficam as peças que
+# separam a entrada do ritmo dos quadros:
+#   - coalesce_motion: uma sequência de MOUSEMOTION vira um evento só (o
+#     último), então um mouse de 1000 Hz não custa 16 eventos por quadro;
+#   - swap_target: a troca sai da direção do arrasto, não só da casa onde o
+#     botão foi solto (gestos rápidos passam da casa vizinha);
+#   - GestureQueue: trocas feitas durante uma animação ficam guardadas, com
+#     o instante em que foram feitas, e são jogadas quando ela termina; a
+#     fila é esvaziada quando o tabuleiro é embaralhado ou uma troca é
+#     desfeita (as trocas guardadas miravam o tabuleiro de antes).
+from collections import deque, namedtuple
+
+import pygame
+
+MAX_QUEUED_GESTURES = 2  # Trocas guardadas durante uma animação
+DRAG_THRESHOLD = 0.35    # Fração da casa que o arrasto precisa andar
+
+Gesture = namedtuple("Gesture", "pos1 pos2 time")
+
+
+def coalesce_motion(events):
+    """Lista de eventos com cada sequência de MOUSEMOTION reduzida à última."""
+    coalesced = []
+    for event in events:
+        if (event.type == pygame.MOUSEMOTION and coalesced
+                and coalesced[-1].type == pygame.MOUSEMOTION):
+            coalesced[-1] = event
+        else:
+            coalesced.append(event)
+    return coalesced
+
+def swap_target(cell, release_cell, press_pos, release_pos, cell_size, rows, cols):
+    """
+    Casa vizinha com que 'cell' deve trocar, ou None.
+    Soltar numa vizinha vale como antes; fora dela, vale o eixo dominante do
+    arrasto, se ele andou pelo menos DRAG_THRESHOLD de uma casa.
+    """
+    r, c = cell
+    if release_cell and abs(release_cell[0] - r) + abs(release_cell[1] - c) == 1:
+        return release_cell
+    dx = release_pos[0] - press_pos[0]
+    dy = release_pos[1] - press_pos[1]
+    if max(abs(dx), abs(dy)) < cell_size * DRAG_THRESHOLD:
+        return None
+    if abs(dx) >= abs(dy):
+        target = (r, c + (1 if dx > 0 else -1))
+    else:
+        target = (r + (1 if dy > 0 else -1), c)
+    if 0 <= target[0] < rows and 0 <= target[1] < cols:
+        return target
+    return None
+
+
+class GestureQueue:
+    """
+    Fila curta de trocas (Gesture). Cheia, a mais antiga sai: vale a
+    intenção mais recente do jogador.
+    """
+
+    def __init__(self, max_size=MAX_QUEUED_GESTURES):
+        self._queue = deque(maxlen=max_size)
+
+    def push(self, pos1, pos2, time):
+        self._queue.append(Gesture(pos1, pos2, time))
+
+    def pop(self):
+        """Troca mais antiga da fila, ou None."""
+        return self._queue.popleft() if self._queue else None
+
+    def clear(self):
+        self._queue.clear()
+
+    def __len__(self):
+        return len(self._queue)
@@ -0,0 +1,65 @@
+# --- Dicas em segundo plano ---
+# Assim que a cascata de uma troca é resolvida, a próxima dica e o "sem
+# jogadas" são calculados numa thread, enquanto a animação ainda roda: o
+# clique em "Dica" só lê o resultado pronto.
+# O trabalhador guarda sua própria cópia do tabuleiro e um MoveIndex; a cada
+# pedido, só as casas que mudaram desde o anterior são reavaliadas.
+# Em grades grandes o MoveIndex custa caro para montar (quase 1 s num
+# 200x200); lá a cópia é um BitBoard, com o codec da distribuição da
+# partida, e a dica sai das máscaras de bits.
+
+from bitboard import BitBoard, Codec
+from engine import EASY_NUMBERS_LIST, MoveIndex
+from worker import LatestOnlyWorker
+
+BITBOARD_MIN_CELLS = 32 * 32  # A partir daqui o trabalhador usa o BitBoard
+
+
+class HintWorker(LatestOnlyWorker):
+    """
+    request(board, version) agenda o cálculo numa cópia do tabuleiro e
+    devolve um Future de (versão, dica); dica None = tabuleiro sem jogadas.
+    Um pedido novo cancela o anterior, e um pedido que já ficou velho quando
+    a thread chega nele devolve None sem calcular nada. 'numbers' é a
+    distribuição de peças da partida (padrão: EASY_NUMBERS_LIST).
+    """
+
+    def __init__(self, numbers=None):
+        super().__init__()
+        self._codec = Codec(numbers or EASY_NUMBERS_LIST)
+        self._board = None   # Só a thread do trabalhador mexe nestes dois
+        self._index = None   # MoveIndex ou BitBoard
+        self._latest = None
+
+    def request(self, board, version):
+        snapshot = [list(row) for row in board]
+        self._latest = version
+        return self._submit(self._compute, snapshot, version)
+
+    def _compute(self, snapshot, version):
+        if version != self._latest:
+            return None  # O tabuleiro já mudou de novo
+        board = self._board
+        if board is None or (len(board), len(board[0])) != (len(snapshot), len(snapshot[0])):
+            self._board = snapshot
+            if len(snapshot) * len(snapshot[0]) >= BITBOARD_MIN_CELLS:
+                self._index = BitBoard.from_board(snapshot, self._codec)
+            else:
+                self._index = MoveIndex(snapshot)
+        else:
+            changed = []
+            for r, (row, new_row) in enumerate(zip(board, snapshot)):
+                if row == new_row:
+                    continue
+                for c, number in enumerate(new_row):
+                    if row[c] != number:
+                        row[c] = number
+                        changed.append((r, c))
+            if isinstance(self._index, BitBoard):
+                for r, c in changed:
+                    self._index.set(r, c, board[r][c])
+            else:
+                self._index.mark_changed(changed)
+        if isinstance(self._index, BitBoard):
+            return version, self._index.find_hint()
+        return version, self._index.hint()
@@ -0,0 +1,156 @@
+# --- Gerador de Níveis (offline) ---
+# Gera um pacote de níveis com dificuldade crescente e confere cada um com
+# partidas simuladas (simulate.play_game) a partir do próprio tabuleiro
+# inicial do nível:
+#   1. sorteia grade, movimentos, distribuição e reposição conforme a
+#      dificuldade do nível (0 = primeiro, 1 = último);
+#   2. monta o tabuleiro inicial com shuffle_board (sem trinca pronta e com
+#      jogada garantida);
+#   3. uma rodada de partidas calibra a meta para a taxa de vitórias
+#      desejada, e uma segunda rodada, com outras sementes, mede a taxa real;
+#   4. se ela ficar longe demais do alvo, tenta outra combinação.
+# Cada nível tem sua própria semente, derivada de (semente base, número), então
+# o resultado não depende de quantos processos rodam. Exemplo:
+#   python levelgen.py --count 30 --games 100 --out assets/levels.ccl
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import create_board, shuffle_board
+from levels import DEFAULT_PACK, Level, save_levels
+from montecarlo import expand_distribution
+from refill import REFILL_STRATEGIES
+from simulate import POLICIES, play_game, summarize
+
+WIN_RATE_EASY = 0.9    # Vitórias desejadas (bot) no primeiro nível
+WIN_RATE_HARD = 0.3    # ... e no último
+WIN_RATE_TOLERANCE = 0.1
+MAX_STALL_RATE = 0.05  # Partidas que travam nem embaralhando
+MAX_ATTEMPTS = 6
+MIN_SIDE, MAX_SIDE = 6, 10
+MOVES_RANGE = (15, 25)
+SCORE_STEP = 10        # Metas arredondadas para múltiplos de 10
+
+
+# --- Sorteio de um nível ---
+def level_distribution(difficulty, rng):
+    """
+    {valor: peso}: fatores de 1 até um máximo que cresce com a dificuldade e
+    todos os produtos entre eles. Mais fatores = mais valores distintos =
+    menos combinações; o 1 (a*1 == a) fica mais raro nos níveis difíceis.
+    """
+    max_factor = 3 + round(difficulty * 6)
+    weights = {1: 2 + round(4 * (1 - difficulty))}
+    for factor in range(2, max_factor + 1):
+        weights[factor] = max(3, 16 - 2 * factor)
+    for a in range(2, max_factor + 1):
+        for b in range(a, max_factor + 1):
+            weights[a * b] = weights.get(a * b, 0) + 2
+    return {value: max(1, round(weight * rng.uniform(0.5, 1.5)))
+            for value, weight in sorted(weights.items())}
+
+def level_shape(difficulty, rng):
+    """(linhas, colunas, movimentos, reposição)"""
+    side = round(MIN_SIDE + difficulty * (MAX_SIDE - MIN_SIDE) + rng.uniform(-1, 1))
+    cols = min(MAX_SIDE, max(MIN_SIDE, side))
+    rows = min(MAX_SIDE, max(MIN_SIDE, side + rng.choice((-1, 0, 0, 1))))
+    moves = rng.randint(*MOVES_RANGE)
+    if difficulty < 1 / 3:
+        refill = "assist"
+    elif difficulty > 2 / 3:
+        refill = "avoid"
+    else:
+        refill = "random"
+    return rows, cols, moves, refill
+
+def calibrate_target(scores, win_rate):
+    """Meta que 'win_rate' das partidas atingem (arredondada)."""
+    ordered = sorted(scores)
+    index = min(len(ordered) - 1, max(0, int(len(ordered) * (1 - win_rate))))
+    return max(SCORE_STEP, round(ordered[index] / SCORE_STEP) * SCORE_STEP)
+
+# --- Geração (um nível por tarefa) ---
+def generate_level(number, count, base_seed, games, policy_name="greedy"):
+    """Executado no processo filho: devolve o Level calibrado."""
+    rng = random.Random(f"{base_seed}:level:{number}")
+    policy = POLICIES[policy_name]
+    difficulty = (number - 1) / max(1, count - 1)
+    wanted = WIN_RATE_EASY + (WIN_RATE_HARD - WIN_RATE_EASY) * difficulty
+
+    best = None  # (erro, Level)
+    for _ in range(MAX_ATTEMPTS):
+        weights = level_distribution(difficulty, rng)
+        numbers = expand_distribution(weights)
+        rows, cols, moves, refill_name = level_shape(difficulty, rng)
+        refill = REFILL_STRATEGIES[refill_name]
+        board = create_board(rows, cols, numbers, rng)
+        if not shuffle_board(board, numbers, rng):
+            continue  # Distribuição sem jogada possível
+
+        calibration_rng = random.Random(rng.getrandbits(64))
+        scores = [play_game(policy, rows, cols, moves, 0, calibration_rng, numbers,
+                            refill, board)["score"] for _ in range(games)]
+        target = calibrate_target(scores, wanted)
+
+        check_rng = random.Random(rng.getrandbits(64))
+        summary = summarize([play_game(policy, rows, cols, moves, target, check_rng,
+                                       numbers, refill, board) for _ in range(games)])
+        if summary["stall_rate"] > MAX_STALL_RATE:
+            continue
+        stats = {
+            "games": games,
+            "win_rate": summary["win_rate"],
+            "score_mean": summary["score_mean"],
+            "cascade_depth_mean": summary["cascade_depth_mean"],
+            "score_p10": summary["score_p10"],
+            "score_p50": round(summary["score_median"]),
+            "score_p90": summary["score_p90"],
+        }
+        level = Level(number, rows, cols, weights, moves, target, refill_name,
+                      rng.getrandbits(63), board, stats)
+        error = abs(summary["win_rate"] - wanted)
+        if best is None or error < best[0]:
+            best = (error, level)
+        if error <= WIN_RATE_TOLERANCE:
+            break
+    if best is None:
+        raise RuntimeError(f"nível {number}: nenhuma combinação jogável")
+    return best[1]
+
+def generate_pack(count, games, base_seed=0, policy_name="greedy", workers=None,
+                  on_progress=None):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_level, number, count, base_seed, games, policy_name)
+                   for number in range(1, count + 1)]
+        levels = []
+        for future in futures:
+            levels.append(future.result())
+            if on_progress:
+                on_progress(levels[-1])
+    return levels
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de níveis do CalculoCrush")
+    parser.add_argument("--count", type=int, default=30, help="número de níveis")
+    parser.add_argument("--games", type=int, default=100,
+                        help="partidas simuladas por rodada de cada nível")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_PACK)
+    args = parser.parse_args(argv)
+
+    def report(level):
+        print(f"nível {level.number:>3}: {level.rows}x{level.cols}, "
+              f"{level.starting_moves} movimentos, meta {level.target_score}, "
+              f"{level.refill}, vitórias {level.stats['win_rate']:.0%}", flush=True)
+
+    start = time.perf_counter()
+    levels = generate_pack(args.count, args.games, args.seed, args.policy, args.workers,
+                           report)
+    save_levels(args.out, levels)
+    print(f"{len(levels)} níveis em {args.out} ({time.perf_counter() - start:.1f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# --- Pacote de Níveis ---
+# Cada nível tem sua grade, sua distribuição de peças, sua meta, sua
+# estratégia de reposição e um tabuleiro inicial já validado (sem trinca
+# pronta e com pelo menos uma jogada). Os níveis são gerados e calibrados
+# offline (levelgen.py) e gravados num arquivo binário compacto; o jogo só lê.
+# Formato (.ccl):
+#   cabeçalho: "CCLV", versão (u8), nº de níveis (u16)
+#   por nível: linhas (u8), colunas (u8), movimentos (u16), meta (u32),
+#              semente (u64), reposição (u8, índice em REFILL_NAMES),
+#              nº de valores (u8), partidas simuladas (u16),
+#              vitórias (f32), pontos médios (f32), cascata média (f32),
+#              pontos p10/p50/p90 (u32 cada)
+#              valores: (valor u16, peso u16) em ordem crescente de valor
+#              tabuleiro: uma casa por byte, índice na lista de valores
+# Para listar um pacote:
+#   python levels.py assets/levels.ccl
+import argparse
+import os
+import struct
+import sys
+
+from atomicfile import atomic_write
+
+MAGIC = b"CCLV"
+VERSION = 1
+HEADER = struct.Struct(">4sBH")
+LEVEL = struct.Struct(">BBHIQBBHfffIII")
+VALUE = struct.Struct(">HH")
+# Ordem fixa (é o que vai no arquivo): estratégias novas só entram no fim
+REFILL_NAMES = ("random", "avoid", "assist")
+DEFAULT_PACK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "levels.ccl")
+STAT_FIELDS = ("games", "win_rate", "score_mean", "cascade_depth_mean",
+               "score_p10", "score_p50", "score_p90")
+
+
+class LevelError(ValueError):
+    """Arquivo de níveis inválido ou nível inexistente."""
+
+
+class Level:
+    """Um nível pronto para jogar (número começa em 1)."""
+
+    def __init__(self, number, rows, cols, weights, starting_moves, target_score,
+                 refill, seed, board, stats=None):
+        self.number = number
+        self.rows = rows
+        self.cols = cols
+        self.weights = dict(sorted(weights.items()))  # {valor: peso}
+        self.starting_moves = starting_moves
+        self.target_score = target_score
+        self.refill = refill
+        self.seed = seed
+        self.board = [list(row) for row in board]
+        self.stats = dict(stats or {})
+        # Lista no formato de EASY_NUMBERS_LIST; é sempre o mesmo objeto, o
+        # que deixa as tabelas de refill.py serem reaproveitadas entre jogadas
+        self.numbers = [value for value, weight in self.weights.items() for _ in range(weight)]
+
+    def new_board(self):
+        return [list(row) for row in self.board]
+
+    def __repr__(self):
+        return (f"Level({self.number}, {self.rows}x{self.cols}, "
+                f"{self.starting_moves} movimentos, meta {self.target_score})")
+
+
+# --- Codificação ---
+def pack_levels(levels):
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(levels)))
+    for level in levels:
+        values = list(level.weights)
+        if len(values) > 255:
+            raise LevelError(f"nível {level.number}: valores demais ({len(values)})")
+        stats = level.stats
+        out += LEVEL.pack(
+            level.rows, level.cols, level.starting_moves, level.target_score, level.seed,
+            REFILL_NAMES.index(level.refill), len(values), stats.get("games", 0),
+            stats.get("win_rate", 0.0), stats.get("score_mean", 0.0),
+            stats.get("cascade_depth_mean", 0.0), stats.get("score_p10", 0),
+            stats.get("score_p50", 0), stats.get("score_p90", 0))
+        for value, weight in level.weights.items():
+            out += VALUE.pack(value, weight)
+        index = {value: i for i, value in enumerate(values)}
+        out += bytes(index[number] for row in level.board for number in row)
+    return bytes(out)
+
+def unpack_levels(data):
+    if len(data) < HEADER.size:
+        raise LevelError("pacote de níveis truncado")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise LevelError("não é um pacote de níveis do CalculoCrush (ou versão desconhecida)")
+    levels = []
+    offset = HEADER.size
+    try:
+        for number in range(1, count + 1):
+            (rows, cols, moves, target, seed, refill, value_count, games, win_rate,
+             score_mean, depth_mean, p10, p50, p90) = LEVEL.unpack_from(data, offset)
+            offset += LEVEL.size
+            weights = {}
+            for _ in range(value_count):
+                value, weight = VALUE.unpack_from(data, offset)
+                weights[value] = weight
+                offset += VALUE.size
+            values = list(weights)
+            cells = data[offset:offset + rows * cols]
+            if len(cells) != rows * cols:
+                raise LevelError("pacote de níveis truncado")
+            offset += rows * cols
+            board = [[values[i] for i in cells[r * cols:(r + 1) * cols]] for r in range(rows)]
+            stats = dict(zip(STAT_FIELDS, (games, win_rate, score_mean, depth_mean,
+                                           p10, p50, p90)))
+            levels.append(Level(number, rows, cols, weights, moves, target,
+                                REFILL_NAMES[refill], seed, board, stats))
+    except (struct.error, IndexError) as error:
+        raise LevelError(f"pacote de níveis corrompido: {error}") from None
+    return levels
+
+
+# --- Arquivo ---
+_packs = {}  # caminho -> lista de níveis já lidos
+
+def save_levels(path, levels):
+    atomic_write(path, pack_levels(levels))
+    _packs.pop(path, None)
+
+def load_levels(path=DEFAULT_PACK):
+    levels = _packs.get(path)
+    if levels is None:
+        try:
+            with open(path, "rb") as f:
+                levels = unpack_levels(f.read())
+        except OSError as error:
+            raise LevelError(f"não foi possível ler {path}: {error}") from None
+        _packs[path] = levels
+    return levels
+
+def get_level(number, path=DEFAULT_PACK):
+    levels = load_levels(path)
+    if not 1 <= number <= len(levels):
+        raise LevelError(f"nível {number} não existe (o pacote tem {len(levels)})")
+    return levels[number - 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lista um pacote de níveis do CalculoCrush")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PACK)
+    args = parser.parse_args(argv)
+    try:
+        levels = load_levels(args.path)
+    except LevelError as error:
+        print(f"ERRO: {error}")
+        return 1
+    print(f"{'nível':>5} {'grade':>7} {'mov':>4} {'meta':>6} {'reposição':>9} "
+          f"{'valores':>7} {'vitórias':>8} {'p50':>6}")
+    for level in levels:
+        print(f"{level.number:>5} {level.rows:>3}x{level.cols:<3} {level.starting_moves:>4} "
+              f"{level.target_score:>6} {level.refill:>9} {len(level.weights):>7} "
+              f"{level.stats['win_rate']:>8.0%} {level.stats['score_p50']:>6}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
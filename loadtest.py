@@ -0,0 +1,234 @@
+# --- Teste de Carga do Servidor ---
+# Abre várias conexões com o server.py, cada uma jogando várias partidas ao
+# mesmo tempo (um pedido pendente por partida), e mede jogadas por segundo e
+# a latência de cada pedido. O cliente mantém uma cópia de cada tabuleiro,
+# reaplicando a linha do tempo da resposta (apply_cascade_step), e escolhe
+# as trocas com um MoveIndex próprio. Esse trabalho do cliente pesa mais que
+# o do servidor, então a carga pode vir de vários processos (--processes).
+# Sem --socket/--port, sobe um servidor local num soquete temporário só para
+# o teste. Exemplos:
+#   python loadtest.py --processes 4 --connections 8 --games 500
+#   python loadtest.py --socket /tmp/calculocrush.sock --duration 30
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from engine import (
+    CascadeStep, MoveIndex, apply_cascade_step, cells_changed_by_refill, swap_pieces,
+)
+from profiler import percentile
+from server import MAX_LINE
+
+
+class ClientGame:
+    """Cópia local de uma partida do servidor."""
+
+    def __init__(self, game_id, board):
+        self.game_id = game_id
+        self.board = board
+        self.index = MoveIndex(board)
+
+    def pick(self, rng):
+        moves = self.index.valid_moves()
+        return rng.choice(moves) if moves else None
+
+    def apply(self, pos1, pos2, response):
+        reshuffled = response.get("reshuffled")
+        if reshuffled is not None:
+            self.board[:] = reshuffled
+            self.index.rebuild()
+        if not response["valid"]:
+            return
+        swap_pieces(self.board, pos1, pos2)
+        changed = {pos1, pos2}
+        for step in map(decode_step, response["steps"]):
+            apply_cascade_step(self.board, step)
+            changed.update(cells_changed_by_refill(step.falling_moves, step.new_pieces))
+        self.index.mark_changed(changed)
+
+
+def decode_step(data):
+    """O inverso de server.encode_steps para um passo (listas JSON -> tuplas)."""
+    return CascadeStep(
+        {tuple(cell) for cell in data["matches"]},
+        data["score_gain"],
+        [(number, tuple(src), tuple(dst)) for number, src, dst in data["falling_moves"]],
+        [(number, tuple(cell)) for number, cell in data["new_pieces"]])
+
+
+class Connection:
+    """Uma conexão; respostas casam com os pedidos pelo "id"."""
+
+    ids = itertools.count(1)
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}  # id -> (Future, instante do envio)
+        self.latencies = []
+        self._task = asyncio.create_task(self._read())
+
+    async def _read(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future, sent = self.pending.pop(response["id"])
+            self.latencies.append(time.perf_counter() - sent)
+            future.set_result(response)
+        for future, _ in self.pending.values():
+            future.set_exception(ConnectionError("servidor fechou a conexão"))
+
+    async def call(self, **request):
+        request["id"] = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request["id"]] = (future, time.perf_counter())
+        self.writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+        response = await future
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response
+
+    async def close(self):
+        self.writer.close()
+        await self._task
+
+
+async def play(connection, rng, deadline, counts, args):
+    """Joga partidas seguidas nesta conexão até o fim do teste."""
+    while time.perf_counter() < deadline:
+        response = await connection.call(cmd="new", seed=rng.getrandbits(63),
+                                          rows=args.rows, cols=args.cols)
+        game = ClientGame(response["game"], response["board"])
+        game_over = response["game_over"]
+        while not game_over and time.perf_counter() < deadline:
+            move = game.pick(rng)
+            if move is None:
+                # Sem jogadas na cópia local: uma troca inválida faz o
+                # servidor embaralhar e devolver o tabuleiro novo
+                move = ((0, 0), (0, 1))
+            response = await connection.call(cmd="swap", game=game.game_id,
+                                              **{"from": move[0], "to": move[1]})
+            game.apply(move[0], move[1], response)
+            counts["moves"] += response["valid"]
+            counts["invalid"] += not response["valid"]
+            game_over = response["game_over"]
+        await connection.call(cmd="close", game=game.game_id)
+        counts["games"] += game_over
+
+async def open_connection(args):
+    if args.socket:
+        return await asyncio.open_unix_connection(args.socket, limit=MAX_LINE * 16)
+    return await asyncio.open_connection(args.host, args.port, limit=MAX_LINE * 16)
+
+async def run(args, seed):
+    """Carga de um processo: devolve (contagens, latências, segundos)."""
+    rng = random.Random(seed)
+    connections = [Connection(*await open_connection(args)) for _ in range(args.connections)]
+    counts = {"moves": 0, "invalid": 0, "games": 0}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(
+        play(connection, random.Random(rng.getrandbits(63)), deadline, counts, args)
+        for connection in connections for _ in range(args.games)))
+    elapsed = time.perf_counter() - start
+    for connection in connections:
+        await connection.close()
+    return counts, [t for connection in connections for t in connection.latencies], elapsed
+
+def run_process(args, seed):
+    return asyncio.run(run(args, seed))
+
+async def server_stats(args):
+    connection = Connection(*await open_connection(args))
+    stats = await connection.call(cmd="stats")
+    await connection.close()
+    return stats
+
+def summarize(args, results, stats):
+    counts = {key: sum(result[0][key] for result in results) for key in results[0][0]}
+    latencies = [t for result in results for t in result[1]]
+    elapsed = max(result[2] for result in results)
+    p50, p95, p99 = (percentile(latencies, pct) * 1000 for pct in (50, 95, 99))
+    return {
+        "processes": args.processes,
+        "connections": args.processes * args.connections,
+        "concurrent_games": args.processes * args.connections * args.games,
+        "seconds": round(elapsed, 2),
+        "moves": counts["moves"],
+        "moves_per_sec": round(counts["moves"] / elapsed, 1),
+        "invalid_swaps": counts["invalid"],
+        "games_finished": counts["games"],
+        "requests": len(latencies),
+        "latency_p50_ms": round(p50, 3),
+        "latency_p95_ms": round(p95, 3),
+        "latency_p99_ms": round(p99, 3),
+        "latency_max_ms": round(max(latencies, default=0.0) * 1000, 3),
+        "server_games_open": stats["games"],
+    }
+
+def start_local_server(path):
+    """Sobe o server.py num soquete temporário e espera ele aparecer."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"),
+         "--socket", path], stderr=subprocess.DEVNULL)
+    for _ in range(200):
+        if os.path.exists(path):
+            return process
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("o servidor local não subiu")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor do CalculoCrush")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--socket", help="soquete Unix de um servidor já rodando")
+    target.add_argument("--port", type=int, help="porta TCP de um servidor já rodando")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--processes", type=int, default=1, help="processos de cliente")
+    parser.add_argument("--connections", type=int, default=4, help="conexões por processo")
+    parser.add_argument("--games", type=int, default=250, help="partidas simultâneas por conexão")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos de teste")
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args(argv)
+
+    process = None
+    if not args.socket and args.port is None:
+        args.socket = os.path.join(tempfile.mkdtemp(prefix="calculocrush-"), "server.sock")
+        process = start_local_server(args.socket)
+    try:
+        rng = random.Random(args.seed)
+        seeds = [rng.getrandbits(63) for _ in range(args.processes)]
+        if args.processes == 1:
+            results = [run_process(args, seeds[0])]
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                results = pool.starmap(run_process, [(args, seed) for seed in seeds])
+        summary = summarize(args, results, asyncio.run(server_stats(args)))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for key, value in summary.items():
+            print(f"{key:>20}: {value}")
+
+if __name__ == "__main__":
+    main()
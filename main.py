@@ -1,11 +1,30 @@
 import pygame
-import random
+import argparse
 import os
 import math
+import sys
+import time
+from collections import OrderedDict
+
+import engine
+from animation import Timeline, Tween, lerp, wait
+from atlas import default_cache_dir, load_atlas, make_key, save_atlas
+from engine import (
+    GRID_COLS, GRID_ROWS, REFILL_STRATEGY, STARTING_MOVES, TARGET_SCORE,
+    apply_cascade_step, apply_swap_events, create_board, is_swap_valid, new_game_rng,
+    shuffle_board, swap_pieces,
+)
+from gestures import GestureQueue, coalesce_motion, swap_target
+from hints import HintWorker
+from levels import DEFAULT_PACK, LevelError, get_level
+from profiler import FrameProfiler
+from refill import REFILL_STRATEGIES
+from replay import MAX_SEED, Replay
+from snapshot import BoardHistory, pack_rng, restore_rng
+from solver import BackgroundSolver
 
 # --- Constantes de Jogo ---
-GRID_ROWS = 8
-GRID_COLS = 8
+# GRID_ROWS e GRID_COLS vêm do engine.py
 BLOCK_SIZE = 80
 UI_HEIGHT = 150 # AUMENTADO de 100 para 150
 GAME_WIDTH = GRID_COLS * BLOCK_SIZE # 640
@@ -23,7 +42,21 @@ WINDOW_HEIGHT = GAME_HEIGHT + (PADDING_Y * 2) # 790 + 100 = 890
 GAME_AREA_X_OFFSET = PADDING_X
 GAME_AREA_Y_OFFSET = PADDING_Y
 
-FPS = 60 
+FPS = 60 # Limite padrão de quadros; 0 = sem limite (--fps)
+
+# --- Viewport (rolagem e zoom) ---
+# A janela tem sempre o tamanho de uma grade 8x8; tabuleiros maiores (modo
+# maratona) rolam e dão zoom dentro dela, e só as casas visíveis são desenhadas.
+GRID_VIEW_WIDTH = GAME_WIDTH
+GRID_VIEW_HEIGHT = GAME_HEIGHT - UI_HEIGHT
+MIN_ZOOM = 0.25
+MAX_ZOOM = 2.0
+ZOOM_STEP = 1.25
+SCROLL_STEP = BLOCK_SIZE // 2
+MARATHON_SIZE = 200
+# Acima disso o solver em segundo plano fica desligado (a dica rápida continua):
+# num 20x20 a profundidade 1 já não cabe no orçamento de 50 ms
+SOLVER_MAX_CELLS = 16 * 16
 
 # --- Paleta de Cores Moderna ---
 WHITE = (230, 230, 230)
@@ -49,114 +82,200 @@ HINT_BUTTON_RECT = pygame.Rect(GAME_WIDTH // 2 - 60, 90, 120, 40) # (y=90)
 # Constantes de Animação
 ANIM_SWAP_SPEED = 300
 ANIM_FALL_SPEED = 500
-
-# Configurações do Nível 1
-STARTING_MOVES = 20
-TARGET_SCORE = 300
-
-# Lista de números fáceis
-EASY_NUMBERS_LIST = (
-    [1, 2, 3] * 15 + [4, 5] * 7 + [6, 7, 8, 9] * 4 +
-    [4, 6, 8, 9, 10, 12, 15, 16, 18, 20, 24, 25, 36] * 2
-)
-random.shuffle(EASY_NUMBERS_LIST)
+MATCH_FLASH_TIME = 300
 
 # --- Inicialização do Pygame ---
-pygame.init()
-pygame.font.init()
-# --- ATUALIZADO: Usa o tamanho da JANELA ---
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("CalculoCrush")
-clock = pygame.time.Clock()
-
+# Nada é inicializado na importação (testes e benchmarks importam este módulo
+# de graça): bootstrap() abre a janela quando o jogo começa.
+screen = None
+clock = None
 # --- NOVO: Surface do Jogo ---
 # Criamos uma "tela" separada para o jogo.
 # Vamos desenhar o jogo nela, e depois desenhar ela na janela principal.
-game_surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT))
+game_surface = None
+
+def bootstrap(vsync=False):
+    """Inicializa o pygame e abre a janela (uma vez só)."""
+    global screen, clock, game_surface
+    if screen is not None:
+        return screen
+    pygame.init()
+    # --- ATUALIZADO: Usa o tamanho da JANELA ---
+    if vsync:
+        # O vsync do SDL só existe com um renderer (SCALED); sem suporte no
+        # driver, segue sem ele
+        try:
+            screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED,
+                                             vsync=1)
+        except pygame.error:
+            screen = None
+    if screen is None:
+        screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("CalculoCrush")
+    clock = pygame.time.Clock()
+    game_surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT)).convert()
+    layer_cache.clear()  # Camadas feitas antes da janela não estão no formato dela
+    return screen
+
+# --- Replays ---
+# Toda partida grava semente + trocas em REPLAY_DIR ao terminar (ou ao sair).
+# CALCULOCRUSH_SEED=<n> fixa a semente para repetir uma sessão.
+REPLAY_DIR = "replays"
+
+def seed_from_env():
+    """Semente de CALCULOCRUSH_SEED (None se ausente); ValueError se inválida."""
+    text = os.environ.get("CALCULOCRUSH_SEED")
+    if not text:
+        return None
+    try:
+        seed = int(text)
+    except ValueError:
+        raise ValueError(f"CALCULOCRUSH_SEED não é um inteiro: {text!r}") from None
+    if not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"CALCULOCRUSH_SEED fora de 0..{MAX_SEED}: {seed}")
+    return seed
+
+def save_replay(replay):
+    if not replay.moves:
+        return None
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(REPLAY_DIR, f"{stamp}-{replay.seed}.ccr")
+    replay.save(path)
+    return path
 
-# --- Carregamento de Fonte Customizada ---
+# --- Carregamento de Fonte Customizada (sob demanda) ---
+# Cada fonte só é aberta quando algum texto que não está em cache precisa
+# dela; com o atlas em disco, o primeiro quadro não abre nenhuma.
 ASSETS_PATH = "assets"
 FONT_PATH = os.path.join(ASSETS_PATH, "font.ttf")
 
-try:
-    number_font = pygame.font.Font(FONT_PATH, 40)
-    ui_font = pygame.font.Font(FONT_PATH, 30)
-    game_over_font = pygame.font.Font(FONT_PATH, 60)
-    button_font = pygame.font.Font(FONT_PATH, 25)
-    # NOVO: Fonte do Título e "Enfeites"
-    title_font = pygame.font.Font(FONT_PATH, 50)
-    small_font = pygame.font.Font(FONT_PATH, 16)
-except FileNotFoundError:
-    print(f"Erro: Fonte '{FONT_PATH}' não encontrada. Usando fonte padrão.")
-    # Fallback...
-    number_font = pygame.font.SysFont(None, 50)
-    ui_font = pygame.font.SysFont(None, 40)
-    game_over_font = pygame.font.SysFont(None, 70)
-    button_font = pygame.font.SysFont(None, 30)
-    title_font = pygame.font.SysFont(None, 60)
-    small_font = pygame.font.SysFont(None, 20)
-
-# --- Funções de Lógica ---
-def create_board(rows, cols):
-    board = []
-    for row in range(rows):
-        board.append([])
-        for col in range(cols):
-            board[row].append(random.choice(EASY_NUMBERS_LIST))
-    return board
-
-def swap_pieces(board, pos1, pos2):
-    r1, c1 = pos1
-    r2, c2 = pos2
-    board[r1][c1], board[r2][c2] = board[r2][c2], board[r1][c1]
-
-def find_matches(board):
-    matches = set()
-    # Horizontal
-    for r in range(GRID_ROWS):
-        for c in range(GRID_COLS - 2):
-            a = board[r][c]; b = board[r][c+1]; c_val = board[r][c+2]
-            if a > 0 and b > 0 and a * b == c_val:
-                matches.update([(r, c), (r, c+1), (r, c+2)])
-    # Vertical
-    for c in range(GRID_COLS):
-        for r in range(GRID_ROWS - 2):
-            a = board[r][c]; b = board[r+1][c]; c_val = board[r+2][c]
-            if a > 0 and b > 0 and a * b == c_val:
-                matches.update([(r, c), (r+1, c), (r+2, c)])
-    return matches
-
-def find_hint(board):
-    for r in range(GRID_ROWS):
-        for c in range(GRID_COLS):
-            # Direita
-            if c < GRID_COLS - 1:
-                pos1 = (r, c); pos2 = (r, c + 1)
-                swap_pieces(board, pos1, pos2)
-                matches = find_matches(board)
-                swap_pieces(board, pos1, pos2)
-                if matches: return (pos1, pos2)
-            # Baixo
-            if r < GRID_ROWS - 1:
-                pos1 = (r, c); pos2 = (r + 1, c)
-                swap_pieces(board, pos1, pos2)
-                matches = find_matches(board)
-                swap_pieces(board, pos1, pos2)
-                if matches: return (pos1, pos2)
-    return None
-
-def remove_pieces(board, matches):
-    score_gain = 0
-    for r, c in matches:
-        number = board[r][c]
-        if number > 0:
-            score_gain += number 
-            board[r][c] = 0
-    return score_gain
-
-def get_clicked_pos(pos):
+# nome -> (tamanho com a fonte do jogo, tamanho com a fonte padrão)
+FONT_SIZES = {
+    "number": (40, 50),
+    "ui": (30, 40),
+    "game_over": (60, 70),
+    "button": (25, 30),
+    "title": (50, 60),  # NOVO: Fonte do Título e "Enfeites"
+    "small": (16, 20),
+}
+_fonts = {}  # (tamanho, tamanho padrão) -> Font
+
+def load_font(size, fallback_size):
+    key = (size, fallback_size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        try:
+            font = pygame.font.Font(FONT_PATH, size)
+        except FileNotFoundError:
+            if not _fonts:  # Avisa só na primeira fonte
+                print(f"Erro: Fonte '{FONT_PATH}' não encontrada. Usando fonte padrão.")
+            # Fallback: a fonte embutida do pygame (o mesmo que SysFont(None),
+            # sem a varredura lenta das fontes do sistema)
+            font = pygame.font.Font(None, fallback_size)
+        _fonts[key] = font
+    return font
+
+def get_font(name):
+    return load_font(*FONT_SIZES[name])
+
+# --- Viewport ---
+class Viewport:
+    """
+    Janela sobre o tabuleiro. (x, y) é a rolagem, em pixels do tabuleiro no
+    zoom atual; 'rect' é a área da grade no game_surface. Todas as conversões
+    casa <-> pixel (desenho, cliques, animações) passam por aqui.
+    """
+
+    def __init__(self, rows, cols, zoom=1.0):
+        self.rows = rows
+        self.cols = cols
+        self.rect = pygame.Rect(0, UI_HEIGHT, GRID_VIEW_WIDTH, GRID_VIEW_HEIGHT)
+        # Sem zoom abaixo do ponto em que o tabuleiro deixa de cobrir a grade
+        fit = max(GRID_VIEW_WIDTH / (cols * BLOCK_SIZE), GRID_VIEW_HEIGHT / (rows * BLOCK_SIZE))
+        self.min_zoom = min(1.0, max(MIN_ZOOM, fit))
+        self.zoom = 1.0
+        self.x = 0
+        self.y = 0
+        self.set_zoom(zoom)
+
+    @property
+    def cell_size(self):
+        return max(1, round(BLOCK_SIZE * self.zoom))
+
+    def state(self):
+        """O que muda o desenho da grade (para saber quando redesenhar tudo)."""
+        return (self.x, self.y, self.cell_size)
+
+    def clamp(self):
+        size = self.cell_size
+        self.x = max(0, min(self.x, self.cols * size - self.rect.width))
+        self.y = max(0, min(self.y, self.rows * size - self.rect.height))
+
+    def scroll(self, dx, dy):
+        self.x += int(dx)
+        self.y += int(dy)
+        self.clamp()
+
+    def set_zoom(self, zoom, anchor=None):
+        """Muda o zoom mantendo parado o ponto 'anchor' (coordenadas do game_surface)."""
+        ax, ay = anchor or self.rect.center
+        ax -= self.rect.x
+        ay -= self.rect.y
+        old_size = self.cell_size
+        board_x = (self.x + ax) / old_size
+        board_y = (self.y + ay) / old_size
+        self.zoom = max(self.min_zoom, min(MAX_ZOOM, zoom))
+        size = self.cell_size
+        self.x = round(board_x * size - ax)
+        self.y = round(board_y * size - ay)
+        self.clamp()
+
+    def visible_range(self):
+        """(linhas, colunas) com alguma parte visível, como ranges."""
+        size = self.cell_size
+        rows = range(self.y // size,
+                     min(self.rows, -(-(self.y + self.rect.height) // size)))
+        cols = range(self.x // size,
+                     min(self.cols, -(-(self.x + self.rect.width) // size)))
+        return rows, cols
+
+    def is_visible(self, row, col):
+        rows, cols = self.visible_range()
+        return row in rows and col in cols
+
+    def cell_xy(self, row, col):
+        """Canto superior esquerdo da casa no game_surface (aceita frações)."""
+        size = self.cell_size
+        return self.rect.x + col * size - self.x, self.rect.y + row * size - self.y
+
+    def cell_at(self, x, y):
+        """Casa sob o ponto (x, y) do game_surface, ou None."""
+        if not self.rect.collidepoint(x, y):
+            return None
+        size = self.cell_size
+        row = (y - self.rect.y + self.y) // size
+        col = (x - self.rect.x + self.x) // size
+        if row >= self.rows or col >= self.cols:
+            return None
+        return (row, col)
+
+    def reveal(self, row, col):
+        """Centraliza a casa se ela não estiver inteira na tela."""
+        size = self.cell_size
+        x, y = self.cell_xy(row, col)
+        if not self.rect.contains(pygame.Rect(x, y, size, size)):
+            self.x = col * size + size // 2 - self.rect.width // 2
+            self.y = row * size + size // 2 - self.rect.height // 2
+            self.clamp()
+
+# --- Funções de Entrada ---
+def get_clicked_pos(pos, viewport=None):
     """
-    ATUALIZADO: Converte (x, y) da JANELA para (linha, coluna) da grade.
+    ATUALIZADO: Converte (x, y) da JANELA para (linha, coluna) da grade,
+    passando pela rolagem e pelo zoom do viewport.
     """
     x, y = pos
     
@@ -168,53 +287,9 @@ def get_clicked_pos(pos):
     if x < 0 or y < 0 or x >= GAME_WIDTH or y >= GAME_HEIGHT:
         return None # Clicou fora da área do jogo (nos enfeites)
 
-    # 3. Subtrai o offset da UI (agora relativo ao jogo)
-    y_adjusted = y - UI_HEIGHT
-    if y_adjusted < 0: 
-        return None # Clicou na UI (mas dentro do game_surface)
-
-    # 4. Calcula a grade
-    row = y_adjusted // BLOCK_SIZE
-    col = x // BLOCK_SIZE
-    if row >= GRID_ROWS or col >= GRID_COLS or row < 0 or col < 0:
-        return None
-    return (row, col)
-
-def drop_pieces(board):
-    moves = []
-    for c in range(GRID_COLS):
-        drop_to_row = GRID_ROWS - 1
-        for r in range(GRID_ROWS - 1, -1, -1):
-            if board[r][c] > 0:
-                number = board[r][c]
-                if r != drop_to_row:
-                    moves.append((number, (r, c), (drop_to_row, c)))
-                    board[drop_to_row][c] = number
-                    board[r][c] = 0
-                drop_to_row -= 1
-    return moves
-
-def refill_board(board):
-    new_pieces = []
-    for r in range(GRID_ROWS):
-        for c in range(GRID_COLS):
-            if board[r][c] == 0:
-                number = random.choice(EASY_NUMBERS_LIST)
-                board[r][c] = number
-                new_pieces.append((number, (r, c)))
-    return new_pieces
-
-def is_swap_valid(board, pos1, pos2):
-    swap_pieces(board, pos1, pos2)
-    matches = find_matches(board)
-    swap_pieces(board, pos1, pos2)
-    return len(matches) > 0
-
-# --- CORREÇÃO AQUI: Função LERP Adicionada ---
-def lerp(a, b, t):
-    """Interpolação Linear: de 'a' para 'b' em 't' (0.0 a 1.0)"""
-    return a + (b - a) * t
-# --- FIM DA CORREÇÃO ---
+    # 3. O viewport descarta a UI e converte para a grade
+    viewport = viewport or Viewport(GRID_ROWS, GRID_COLS)
+    return viewport.cell_at(x, y)
 
 # --- Funções de Desenho ---
 
@@ -225,37 +300,149 @@ def get_piece_color(number):
     elif number < 10: return COLOR_7_9
     else: return COLOR_PRODUCT
 
-def draw_piece(surface, number, x, y, size=BLOCK_SIZE, border_color=None):
-    """Desenha uma peça na SURFACE especificada."""
-    piece_rect = pygame.Rect(x, y, size, size)
-    color = get_piece_color(number)
-    pygame.draw.rect(surface, color, piece_rect, border_radius=10)
-    
-    text_surface = number_font.render(str(number), True, WHITE)
+# --- Cache de Sprites e Textos ---
+class SurfaceCache:
+    """Cache LRU de surfaces já prontas, com limite de itens."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def get(self, key, factory):
+        surf = self._items.get(key)
+        if surf is not None:
+            self._items.move_to_end(key)
+            return surf
+        surf = factory()
+        self._items[key] = surf
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._items.clear()
+
+# Peças: (número, tamanho, cor da borda) -> surface pronta
+piece_sprite_cache = SurfaceCache(maxsize=512)
+# Textos que mudam (pontos, movimentos): LRU para não crescer sem limite
+text_cache = SurfaceCache(maxsize=128)
+
+def render_text(font_name, text, color):
+    """Texto rasterizado com cache; a fonte só é aberta se o texto não estiver nele."""
+    return text_cache.get((font_name, text, color),
+                          lambda: get_font(font_name).render(text, True, color))
+
+def piece_font(size):
+    """Fonte dos números para o tamanho de peça (o zoom muda o tamanho)."""
+    size_font, fallback_size = FONT_SIZES["number"]
+    return load_font(max(6, size * size_font // BLOCK_SIZE),
+                     max(6, size * fallback_size // BLOCK_SIZE))
+
+def piece_radius(size):
+    return max(1, size * 10 // BLOCK_SIZE)
+
+def _make_piece_sprite(number, size, border_color):
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    piece_rect = sprite.get_rect()
+    radius = piece_radius(size)
+    pygame.draw.rect(sprite, get_piece_color(number), piece_rect, border_radius=radius)
+
+    text_surface = piece_font(size).render(str(number), True, WHITE)
     text_rect = text_surface.get_rect(center=piece_rect.center)
-    surface.blit(text_surface, text_rect)
-    
+    sprite.blit(text_surface, text_rect)
+
     if border_color:
-        pygame.draw.rect(surface, border_color, piece_rect, 5, border_radius=10)
+        pygame.draw.rect(sprite, border_color, piece_rect, max(1, size * 5 // BLOCK_SIZE),
+                         border_radius=radius)
+    return sprite.convert_alpha() if pygame.display.get_surface() else sprite
+
+def draw_piece(surface, number, x, y, size=BLOCK_SIZE, border_color=None):
+    """Desenha uma peça na SURFACE especificada (a partir do sprite em cache)."""
+    sprite = piece_sprite_cache.get(
+        (number, size, border_color),
+        lambda: _make_piece_sprite(number, size, border_color))
+    surface.blit(sprite, (int(x), int(y)))
+
+# --- Atlas em Disco ---
+# Tudo o que o primeiro quadro desenha (peças no tamanho padrão, textos da UI
+# no início da partida) é gravado num atlas ao sair e relido na abertura.
+FIRST_FRAME_TEXTS = (
+    ("title", "CalculoCrush", WHITE),
+    ("ui", f"Pontos: 0 / {TARGET_SCORE}", WHITE),
+    ("ui", f"Movimentos: {STARTING_MOVES}", WHITE),
+    ("button", "Dica", WHITE),
+    ("small", "CalculoCrush | 2025", GRAY_UI),
+)
+
+def _atlas_entries():
+    """(chave, cache, fábrica) de cada sprite do atlas."""
+    entries = []
+    for number in sorted(set(engine.EASY_NUMBERS_LIST)):
+        for border_color in (None, GREEN_MATCH, BLUE_HINT, RED_ERROR):
+            key = (number, BLOCK_SIZE, border_color)
+            entries.append((key, piece_sprite_cache,
+                            lambda key=key: _make_piece_sprite(*key)))
+    for key in FIRST_FRAME_TEXTS:
+        entries.append((key, text_cache,
+                        lambda key=key: get_font(key[0]).render(key[1], True, key[2])))
+    return entries
+
+def _atlas_path_and_key(entries):
+    path = os.path.join(default_cache_dir(), f"atlas-{BLOCK_SIZE}")
+    font_stat = os.stat(FONT_PATH) if os.path.exists(FONT_PATH) else None
+    font_id = (font_stat.st_size, font_stat.st_mtime_ns) if font_stat else None
+    key = make_key(pygame.version.ver, font_id, sorted(FONT_SIZES.items()),
+                   [repr(entry[0]) for entry in entries])
+    return path, key
+
+def load_sprite_atlas():
+    """Preenche os caches com o atlas gravado. Retorna False se não havia atlas válido."""
+    entries = _atlas_entries()
+    sprites = load_atlas(*_atlas_path_and_key(entries))
+    if sprites is None:
+        return False
+    for key, cache, _ in entries:
+        sprite = sprites.get(repr(key))
+        if sprite is not None:
+            cache.get(key, lambda sprite=sprite: sprite)
+    return True
+
+def save_sprite_atlas():
+    """Rasteriza o que faltar e grava o atlas para a próxima execução."""
+    entries = _atlas_entries()
+    path, key = _atlas_path_and_key(entries)
+    sprites = {repr(entry_key): cache.get(entry_key, factory)
+               for entry_key, cache, factory in entries}
+    try:
+        save_atlas(path, key, sprites)
+    except (OSError, pygame.error) as error:
+        print(f"Aviso: atlas não gravado ({error})")
 
 def draw_board_static(surface, board, highlight_set=set(), hint_to_show=None, 
-                      hide_pieces=set()):
-    """Desenha o tabuleiro estático na SURFACE."""
+                      hide_pieces=set(), viewport=None):
+    """Desenha na SURFACE só as casas do tabuleiro visíveis no viewport."""
+    viewport = viewport or Viewport(len(board), len(board[0]))
     # Desenha o fundo da grade (agora relativo ao game_surface)
-    grid_rect = pygame.Rect(0, UI_HEIGHT, GAME_WIDTH, GAME_HEIGHT - UI_HEIGHT)
+    grid_rect = viewport.rect
     pygame.draw.rect(surface, BG_COLOR, grid_rect)
+    size = viewport.cell_size
+    radius = piece_radius(size)
+    visible_rows, visible_cols = viewport.visible_range()
 
-    for row in range(GRID_ROWS):
-        for col in range(GRID_COLS):
+    # Casas cortadas pela borda não podem invadir a UI
+    previous_clip = surface.get_clip()
+    surface.set_clip(grid_rect)
+    for row in visible_rows:
+        board_row = board[row]
+        for col in visible_cols:
             # Coordenadas relativas ao game_surface
-            x = col * BLOCK_SIZE
-            y = (row * BLOCK_SIZE) + UI_HEIGHT
+            x, y = viewport.cell_xy(row, col)
             
             if (row, col) in hide_pieces:
-                pygame.draw.rect(surface, GRID_BG, (x, y, BLOCK_SIZE, BLOCK_SIZE), border_radius=10)
+                pygame.draw.rect(surface, GRID_BG, (x, y, size, size), border_radius=radius)
                 continue
             
-            number = board[row][col]
+            number = board_row[col]
             if number > 0:
                 border_color = None
                 if (row, col) in highlight_set:
@@ -263,48 +450,81 @@ def draw_board_static(surface, board, highlight_set=set(), hint_to_show=None,
                 elif (row, col) == hint_to_show:
                     border_color = BLUE_HINT
                 
-                draw_piece(surface, number, x, y, border_color=border_color)
+                draw_piece(surface, number, x, y, size, border_color=border_color)
+    surface.set_clip(previous_clip)
 
-def draw_ui(surface, score, moves_left, target_score):
-    """ATUALIZADO: Desenha a UI (com Título) na SURFACE."""
-    ui_rect = pygame.Rect(0, 0, GAME_WIDTH, UI_HEIGHT)
-    pygame.draw.rect(surface, GRAY_UI, ui_rect)
+# --- Camadas Estáticas ---
+# O fundo da janela, o painel da UI (título e botão de Dica) e o fim de jogo
+# dependem de poucas entradas: são compostos uma vez, já no formato da tela
+# (convert/convert_alpha), e só refeitos quando a chave (as entradas) muda.
+# Nenhum quadro, nem os de animação, aloca surface para eles.
+layer_cache = SurfaceCache(maxsize=8)
+
+def _display_format(surface, alpha=False):
+    if not pygame.display.get_surface():
+        return surface  # Sem janela (benchmarks): fica no formato original
+    return surface.convert_alpha() if alpha else surface.convert()
+
+def _make_ui_layer():
+    layer = pygame.Surface((GAME_WIDTH, UI_HEIGHT))
+    layer.fill(GRAY_UI)
     
     # 1. Título
-    title_surf = title_font.render("CalculoCrush", True, WHITE)
+    title_surf = render_text("title", "CalculoCrush", WHITE)
     title_rect = title_surf.get_rect(center=(GAME_WIDTH // 2, 45))
-    surface.blit(title_surf, title_rect)
+    layer.blit(title_surf, title_rect)
+    return _display_format(layer)
+
+def _make_hint_button():
+    # Camada própria: o botão vai por cima dos textos de pontos e movimentos
+    button = pygame.Surface(HINT_BUTTON_RECT.size, pygame.SRCALPHA)
+    button_rect = button.get_rect()
+    pygame.draw.rect(button, BLUE_HINT, button_rect, border_radius=10)
+    hint_text_surf = render_text("button", "Dica", WHITE)
+    button.blit(hint_text_surf, hint_text_surf.get_rect(center=button_rect.center))
+    return _display_format(button, alpha=True)
+
+def _make_dim_layer():
+    overlay = pygame.Surface((GAME_WIDTH, GAME_HEIGHT), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 180)) 
+    return _display_format(overlay, alpha=True)
+
+def _make_window_layer(size):
+    layer = pygame.Surface(size)
+    draw_window_decorations(layer)
+    return _display_format(layer)
+
+def window_layer(size=(WINDOW_WIDTH, WINDOW_HEIGHT)):
+    """Fundo da janela com os enfeites (compartilhado, não desenhe nele)."""
+    return layer_cache.get(("window", size), lambda: _make_window_layer(size))
+
+def draw_ui(surface, score, moves_left, target_score):
+    """ATUALIZADO: Desenha a UI (com Título) na SURFACE."""
+    # Fundo, título e botão de Dica vêm prontos das camadas estáticas
+    surface.blit(layer_cache.get(("ui",), _make_ui_layer), (0, 0))
     
-    # 2. Score (agora mais baixo)
-    score_text = f"Pontos: {score} / {target_score}"
-    score_surf = ui_font.render(score_text, True, WHITE)
-    score_rect = score_surf.get_rect(midleft=(25, 105)) # y=105
-    surface.blit(score_surf, score_rect)
+    # 2. Score (agora mais baixo, centrado em y=105)
+    score_surf = render_text("ui", f"Pontos: {score} / {target_score}", WHITE)
+    surface.blit(score_surf, (25, 105 - score_surf.get_height() // 2))
     
     # 3. Movimentos (agora mais baixo)
-    moves_text = f"Movimentos: {moves_left}"
-    moves_surf = ui_font.render(moves_text, True, WHITE)
-    moves_rect = moves_surf.get_rect(midright=(GAME_WIDTH - 25, 105)) # y=105
-    surface.blit(moves_surf, moves_rect)
+    moves_surf = render_text("ui", f"Movimentos: {moves_left}", WHITE)
+    surface.blit(moves_surf, (GAME_WIDTH - 25 - moves_surf.get_width(),
+                              105 - moves_surf.get_height() // 2))
     
     # 4. Botão de Dica (centralizado)
-    pygame.draw.rect(surface, BLUE_HINT, HINT_BUTTON_RECT, border_radius=10)
-    hint_text_surf = button_font.render("Dica", True, WHITE)
-    hint_text_rect = hint_text_surf.get_rect(center=HINT_BUTTON_RECT.center)
-    surface.blit(hint_text_surf, hint_text_rect)
+    surface.blit(layer_cache.get(("hint_button",), _make_hint_button), HINT_BUTTON_RECT)
 
 def draw_game_over(surface, won):
     """Desenha o game over na SURFACE."""
-    overlay = pygame.Surface((GAME_WIDTH, GAME_HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180)) 
-    surface.blit(overlay, (0, 0))
+    surface.blit(layer_cache.get(("dim",), _make_dim_layer), (0, 0))
     
     text = "Você Venceu!" if won else "Fim de Jogo"
     color = GOLD_WIN if won else RED_ERROR
-    text_surf = game_over_font.render(text, True, color)
+    text_surf = render_text("game_over", text, color)
     # Centraliza na ÁREA DE JOGO
-    text_rect = text_surf.get_rect(center=(GAME_WIDTH // 2, GAME_HEIGHT // 2))
-    surface.blit(text_surf, text_rect)
+    surface.blit(text_surf, (GAME_WIDTH // 2 - text_surf.get_width() // 2,
+                             GAME_HEIGHT // 2 - text_surf.get_height() // 2))
 
 # --- NOVO: Função para desenhar os "Enfeites" ---
 def draw_window_decorations(screen):
@@ -321,187 +541,461 @@ def draw_window_decorations(screen):
     pygame.draw.rect(screen, GRAY_UI, frame_rect, 4, border_radius=10)
     
     # Adiciona texto de "crédito" nos enfeites
-    credit_text = small_font.render("CalculoCrush | 2025", True, GRAY_UI)
+    credit_text = render_text("small", "CalculoCrush | 2025", GRAY_UI)
     credit_rect = credit_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - PADDING_Y // 2))
     screen.blit(credit_text, credit_rect)
 
 def update_game_surface(surface, board, score, moves, game_over, won=False, 
-                       hint_to_show=None, highlight_set=set(), hide_pieces=set()):
+                       hint_to_show=None, highlight_set=set(), hide_pieces=set(),
+                       viewport=None, target_score=TARGET_SCORE):
     """
     ATUALIZADO: Função centralizada para redesenhar tudo na GAME_SURFACE.
     """
     surface.fill(BG_COLOR) # Preenche o fundo do jogo
-    draw_board_static(surface, board, highlight_set, hint_to_show, hide_pieces)
-    draw_ui(surface, score, moves, TARGET_SCORE)
+    draw_board_static(surface, board, highlight_set, hint_to_show, hide_pieces, viewport)
+    draw_ui(surface, score, moves, target_score)
     if game_over:
         draw_game_over(surface, won)
 
+# --- Renderização Retida (Retângulos Sujos) ---
+class DirtyRenderer:
+    """
+    Guarda o que já foi desenhado e, a cada quadro, redesenha só as casas e
+    regiões da UI que mudaram, enviando apenas esses retângulos com
+    pygame.display.update(rects). Sem mudanças, o quadro não desenha nada.
+    Só a janela visível do viewport é guardada e comparada; rolar ou dar
+    zoom redesenha a grade inteira (o custo depende da tela, não do tabuleiro).
+    Chame invalidate() depois de algo que desenhe por fora (animações).
+    """
+
+    def __init__(self, screen, surface, target_score=TARGET_SCORE):
+        self.screen = screen
+        self.surface = surface
+        self.target_score = target_score
+        # Os enfeites da janela não mudam: camada estática, reaproveitada
+        # também para restaurar o fundo sob a peça arrastada
+        self.background = window_layer(screen.get_size())
+        self.viewport = None
+        self.invalidate()
+
+    def invalidate(self):
+        self._full = True
+        self._board = None  # Só as casas visíveis, linha a linha
+        self._window = None
+        self._view_state = None
+        self._borders = {}
+        self._hidden = frozenset()
+        self._ui = None
+        self._game_over = None
+        self._drag_rect = None
+
+    @staticmethod
+    def _borders_for(highlight_set, hint_to_show):
+        borders = {}
+        if hint_to_show is not None:
+            borders[hint_to_show] = BLUE_HINT
+        for pos in highlight_set:
+            borders[pos] = GREEN_MATCH  # Verde tem prioridade sobre a dica
+        return borders
+
+    def _screen_rect(self, rect):
+        return rect.move(GAME_AREA_X_OFFSET, GAME_AREA_Y_OFFSET)
+
+    def restore(self, screen_rect):
+        """Recompõe enfeites + jogo só dentro de 'screen_rect'."""
+        self.screen.blit(self.background, screen_rect, area=screen_rect)
+        game_rect = screen_rect.move(-GAME_AREA_X_OFFSET, -GAME_AREA_Y_OFFSET)
+        self.screen.blit(self.surface, screen_rect, area=game_rect)
+
+    def _draw_cell(self, board, row, col, borders, hidden):
+        viewport = self.viewport
+        size = viewport.cell_size
+        x, y = viewport.cell_xy(row, col)
+        cell_rect = pygame.Rect(x, y, size, size)
+        # Casas na borda do viewport são cortadas pela área da grade
+        clip_rect = cell_rect.clip(viewport.rect)
+        self.surface.set_clip(clip_rect)
+        self.surface.fill(BG_COLOR, cell_rect)
+        if (row, col) in hidden:
+            pygame.draw.rect(self.surface, GRID_BG, cell_rect, border_radius=piece_radius(size))
+        elif board[row][col] > 0:
+            draw_piece(self.surface, board[row][col], x, y, size,
+                       border_color=borders.get((row, col)))
+        self.surface.set_clip(None)
+        return clip_rect
+
+    def _drag_rect_for(self, drag):
+        size = self.viewport.cell_size
+        mx, my = drag[1]
+        return pygame.Rect(mx - size // 2, my - size // 2, size, size)
+
+    def _draw_drag(self, board, drag):
+        if not drag:
+            return None
+        (r, c), _ = drag
+        rect = self._drag_rect_for(drag)
+        draw_piece(self.screen, board[r][c], rect.x, rect.y, rect.width,
+                   border_color=RED_ERROR)
+        return rect
+
+    def render(self, board, score, moves, game_over, won=False, hint_to_show=None,
+               highlight_set=frozenset(), hide_pieces=frozenset(), drag=None,
+               viewport=None):
+        """
+        'drag' é ((linha, coluna), (x, y)) da peça arrastada, ou None.
+        Retorna True se algo foi enviado para a tela.
+        """
+        borders = self._borders_for(highlight_set, hint_to_show)
+        hidden = frozenset(hide_pieces)
+        if viewport is None:
+            if self.viewport is None or (self.viewport.rows, self.viewport.cols) != (
+                    len(board), len(board[0])):
+                self.viewport = Viewport(len(board), len(board[0]))
+        else:
+            self.viewport = viewport
+        viewport = self.viewport
+
+        # O overlay de fim de jogo cobre tudo: qualquer mudança nele é total
+        if (self._full or game_over != self._game_over
+                or viewport.state() != self._view_state):
+            self.screen.blit(self.background, (0, 0))
+            update_game_surface(self.surface, board, score, moves, game_over, won,
+                                hint_to_show, highlight_set, hidden, viewport,
+                                self.target_score)
+            self.screen.blit(self.surface, (GAME_AREA_X_OFFSET, GAME_AREA_Y_OFFSET))
+            self._drag_rect = self._draw_drag(board, drag)
+            pygame.display.flip()
+            self._full = False
+            self._view_state = viewport.state()
+            self._window = viewport.visible_range()
+            rows, cols = self._window
+            self._board = [list(board[r][cols.start:cols.stop]) for r in rows]
+            self._borders = borders
+            self._hidden = hidden
+            self._ui = (score, moves)
+            self._game_over = game_over
+            return True
+
+        dirty = []  # Retângulos no game_surface
+        # Casas visíveis com número diferente (linhas iguais são puladas em bloco)
+        last_board = self._board
+        visible_rows, visible_cols = self._window
+        c0, c1 = visible_cols.start, visible_cols.stop
+        for i, r in enumerate(visible_rows):
+            row = list(board[r][c0:c1])
+            last_row = last_board[i]
+            if row == last_row:
+                continue
+            for j, number in enumerate(row):
+                if number != last_row[j]:
+                    dirty.append(self._draw_cell(board, r, c0 + j, borders, hidden))
+            last_board[i] = row
+        # Casas cuja borda ou visibilidade mudou
+        changed = {pos for pos in borders.keys() | self._borders.keys()
+                   if borders.get(pos) != self._borders.get(pos)}
+        changed.update(hidden ^ self._hidden)
+        for r, c in changed:
+            if r in visible_rows and c in visible_cols:
+                dirty.append(self._draw_cell(board, r, c, borders, hidden))
+        self._borders = borders
+        self._hidden = hidden
+
+        if (score, moves) != self._ui:
+            draw_ui(self.surface, score, moves, self.target_score)
+            dirty.append(pygame.Rect(0, 0, GAME_WIDTH, UI_HEIGHT))
+            self._ui = (score, moves)
+
+        screen_dirty = []
+        for rect in dirty:
+            screen_rect = self._screen_rect(rect)
+            self.screen.blit(self.surface, screen_rect, area=rect)
+            screen_dirty.append(screen_rect)
+
+        # A peça arrastada fica por cima de tudo, direto na tela
+        drag_rect = None
+        if drag or self._drag_rect:
+            drag_rect = self._drag_rect_for(drag) if drag else None
+            moved = drag_rect != self._drag_rect
+            touched = drag_rect is not None and drag_rect.collidelist(screen_dirty) != -1
+            if moved or touched:
+                if self._drag_rect:
+                    self.restore(self._drag_rect)
+                    screen_dirty.append(self._drag_rect)
+                if drag_rect:
+                    self.restore(drag_rect)
+                    self._draw_drag(board, drag)
+                    screen_dirty.append(drag_rect)
+            self._drag_rect = drag_rect
+
+        if screen_dirty:
+            pygame.display.update(screen_dirty)
+            return True
+        return False
+
 # --- Funções de Animação ---
+# As animações não bloqueiam: só enfileiram tweens na Timeline, que o loop
+# principal avança uma vez por quadro. A lógica já foi resolvida antes;
+# o BoardView guarda o que deve aparecer na tela enquanto isso.
+
+class BoardView:
+    """Estado exibido durante uma animação (pode estar atrás da lógica)."""
+
+    def __init__(self, target_score=TARGET_SCORE):
+        self.board = None
+        self.score = 0
+        self.moves = 0
+        self.target_score = target_score
+        self.highlight = set()
+        self.hidden = set()
+        # chave -> (número, linha, coluna) de peças em movimento; em casas (com
+        # frações), para a rolagem e o zoom valerem também no meio da animação
+        self.sprites = {}
 
-def animate_swap(surface, board, pos1, pos2, is_valid, score_data):
-    """Anima a troca na GAME_SURFACE."""
+    def show(self, board, score, moves, highlight=(), hidden=()):
+        self.board = board
+        self.score = score
+        self.moves = moves
+        self.highlight = set(highlight)
+        self.hidden = set(hidden)
+        self.sprites = {}
+
+def queue_swap_animation(timeline, view, board, pos1, pos2, is_valid, score, moves):
+    """Enfileira a troca (e a volta, se for inválida). 'board' é o de antes da troca."""
     r1, c1 = pos1
     r2, c2 = pos2
     n1, n2 = board[r1][c1], board[r2][c2]
-    
-    # Coordenadas relativas ao game_surface
-    x1, y1 = c1 * BLOCK_SIZE, (r1 * BLOCK_SIZE) + UI_HEIGHT
-    x2, y2 = c2 * BLOCK_SIZE, (r2 * BLOCK_SIZE) + UI_HEIGHT
-    
-    start_time = pygame.time.get_ticks()
-    
-    animating = True
-    while animating:
-        elapsed = pygame.time.get_ticks() - start_time
-        t = min(1.0, elapsed / ANIM_SWAP_SPEED)
-        
-        # Redesenha o jogo estático (no game_surface)
-        update_game_surface(surface, board, **score_data, hide_pieces={pos1, pos2})
-        
-        current_x1 = lerp(x1, x2, t)
-        current_y1 = lerp(y1, y2, t)
-        current_x2 = lerp(x2, x1, t)
-        current_y2 = lerp(y2, y1, t)
-        
-        # Desenha as peças animadas (no game_surface)
-        draw_piece(surface, n1, current_x1, current_y1)
-        draw_piece(surface, n2, current_x2, current_y2)
-        
-        # --- ATUALIZAÇÃO IMPORTANTE ---
-        # Blit o game_surface na tela principal
-        screen.blit(surface, (GAME_AREA_X_OFFSET, GAME_AREA_Y_OFFSET))
-        pygame.display.flip() # Atualiza a tela inteira
-        
-        if t >= 1.0: animating = False
-        clock.tick(FPS)
+    board_before = [list(row) for row in board]
+
+    def start():
+        view.show(board_before, score, moves, hidden={pos1, pos2})
+
+    def forward(t):
+        view.sprites["swap1"] = (n1, lerp(r1, r2, t), lerp(c1, c2, t))
+        view.sprites["swap2"] = (n2, lerp(r2, r1, t), lerp(c2, c1, t))
+
+    def backward(t):
+        forward(1.0 - t)
 
+    timeline.queue(Tween(ANIM_SWAP_SPEED, on_start=start, on_update=forward))
     if not is_valid:
-        start_time = pygame.time.get_ticks()
-        animating = True
-        while animating:
-            elapsed = pygame.time.get_ticks() - start_time
-            t = min(1.0, elapsed / ANIM_SWAP_SPEED)
-            
-            update_game_surface(surface, board, **score_data, hide_pieces={pos1, pos2})
-            
-            current_x1 = lerp(x2, x1, t)
-            current_y1 = lerp(y2, y1, t)
-            current_x2 = lerp(x1, x2, t)
-            current_y2 = lerp(y1, y2, t)
-            
-            draw_piece(surface, n1, current_x1, current_y1)
-            draw_piece(surface, n2, current_x2, current_y2)
-            
-            screen.blit(surface, (GAME_AREA_X_OFFSET, GAME_AREA_Y_OFFSET))
-            pygame.display.flip()
-            
-            if t >= 1.0: animating = False
-            clock.tick(FPS)
+        timeline.queue(Tween(ANIM_SWAP_SPEED, on_update=backward))
 
-def animate_fall_and_refill(surface, board_before_drop, falling_moves, 
-                            new_pieces, score_data):
-    """Anima a queda na GAME_SURFACE."""
-    start_time = pygame.time.get_ticks()
-    
-    animating = True
-    while animating:
-        elapsed = pygame.time.get_ticks() - start_time
-        t = min(1.0, elapsed / ANIM_FALL_SPEED)
-        
-        # Desenha o tabuleiro estático (antes da queda)
-        update_game_surface(surface, board_before_drop, **score_data)
-        
-        # Anima peças caindo
-        for number, (r_from, c_from), (r_to, c_to) in falling_moves:
-            x = c_from * BLOCK_SIZE
-            y_from = (r_from * BLOCK_SIZE) + UI_HEIGHT
-            y_to = (r_to * BLOCK_SIZE) + UI_HEIGHT
-            current_y = lerp(y_from, y_to, t)
-            draw_piece(surface, number, x, current_y)
-            
-        # Anima novas peças entrando
-        for number, (r, c) in new_pieces:
-            x = c * BLOCK_SIZE
-            y_to = (r * BLOCK_SIZE) + UI_HEIGHT
-            y_from = y_to - (GRID_ROWS * BLOCK_SIZE)
-            current_y = lerp(y_from, y_to, t)
-            draw_piece(surface, number, x, current_y)
-
-        screen.blit(surface, (GAME_AREA_X_OFFSET, GAME_AREA_Y_OFFSET))
-        pygame.display.flip()
-        
-        if t >= 1.0: animating = False
-        clock.tick(FPS)
+def _queue_cascade_step(timeline, view, shown, step, score, moves):
+    rows = len(shown)
 
-def run_combo_loop(surface, board, score, moves_left):
-    """Executa o combo, desenhando na GAME_SURFACE."""
-    total_score_gain = 0
-    matches = find_matches(board)
-    
-    score_data = {
-        "score": score, "moves": moves_left, "game_over": False, 
-        "won": False, "hint_to_show": None
-    }
-    
-    while matches:
+    def flash():
         # Flash Verde
-        update_game_surface(surface, board, **score_data, highlight_set=matches)
-        screen.blit(surface, (GAME_AREA_X_OFFSET, GAME_AREA_Y_OFFSET))
-        pygame.display.flip()
-        pygame.time.wait(300)
-
-        score_gain = remove_pieces(board, matches)
-        total_score_gain += score_gain
-        score_data["score"] += score_gain
-        
-        board_before_drop = [row.copy() for row in board]
-        falling_moves = drop_pieces(board)
-        new_pieces = refill_board(board)
-        
-        # Anima a queda (que também atualiza a tela)
-        animate_fall_and_refill(surface, board_before_drop, falling_moves, 
-                                new_pieces, score_data)
-        
-        matches = find_matches(board)
-        
-    return total_score_gain
+        view.show(shown, score, moves, highlight=step.matches)
+
+    def start_fall():
+        # Some a combinação; as peças que caem saem da origem e viram sprites
+        for r, c in step.matches:
+            shown[r][c] = 0
+        for _, (r_from, c_from), _ in step.falling_moves:
+            shown[r_from][c_from] = 0
+        view.show(shown, score + step.score_gain, moves)
+
+    def fall(t):
+        for i, (number, (r_from, c_from), (r_to, _)) in enumerate(step.falling_moves):
+            view.sprites[("fall", i)] = (number, lerp(r_from, r_to, t), c_from)
+        for i, (number, (r, c)) in enumerate(step.new_pieces):
+            view.sprites[("new", i)] = (number, lerp(r - rows, r, t), c)
+
+    def land():
+        apply_cascade_step(shown, step)
+
+    timeline.queue(wait(MATCH_FLASH_TIME, on_start=flash))
+    timeline.queue(Tween(ANIM_FALL_SPEED, on_start=start_fall, on_update=fall, on_done=land))
+
+def queue_cascade_animation(timeline, view, shown, steps, score, moves):
+    """
+    Enfileira a linha do tempo de apply_swap_events. 'shown' é uma cópia do
+    tabuleiro logo após a troca; os passos são reconstruídos nela, em ordem.
+    """
+    for step in steps:
+        _queue_cascade_step(timeline, view, shown, step, score, moves)
+        score += step.score_gain
+
+def draw_animation_frame(surface, view, viewport=None):
+    """Desenha um quadro de animação a partir do BoardView."""
+    viewport = viewport or Viewport(len(view.board), len(view.board[0]))
+    update_game_surface(surface, view.board, view.score, view.moves, False,
+                        highlight_set=view.highlight, hide_pieces=view.hidden,
+                        viewport=viewport, target_score=view.target_score)
+    # Peças em movimento fora do viewport nem são desenhadas
+    visible_rows, visible_cols = viewport.visible_range()
+    size = viewport.cell_size
+    surface.set_clip(viewport.rect)
+    for number, row, col in view.sprites.values():
+        if (visible_rows.start - 1 < row < visible_rows.stop
+                and visible_cols.start - 1 < col < visible_cols.stop):
+            x, y = viewport.cell_xy(row, col)
+            draw_piece(surface, number, x, y, size)
+    surface.set_clip(None)
+    screen.blit(surface, (GAME_AREA_X_OFFSET, GAME_AREA_Y_OFFSET))
+    pygame.display.flip()
+
+# --- Perfil de Quadros (F3) ---
+# F3 liga o overlay com o gráfico dos últimos quadros e p50/p95/p99.
+# CALCULOCRUSH_PROFILE=<arquivo> grava desde o início e salva ao sair
+# (.json = Chrome trace, qualquer outra extensão = CSV).
+PROFILER_KEY = pygame.K_F3
+PROFILER_RECT = pygame.Rect(8, 8, 240, 190)  # Na JANELA, por cima dos enfeites
+PROFILER_GRAPH_HEIGHT = 60
+PROFILER_MS_PER_PIXEL = 0.5
+PROFILER_LINES = 6  # Seções listadas (as mais caras)
+
+def watch_hot_paths(profiler):
+    """Registra as rotinas quentes da lógica, do desenho e da tela."""
+    game = sys.modules[__name__]
+    for name in ("find_matches", "find_matches_incremental", "drop_pieces", "refill_board"):
+        profiler.watch(engine, name)
+    profiler.watch(game, "update_game_surface")
+    profiler.watch(game, "draw_piece")
+    profiler.watch(pygame.display, "flip", "display.flip")
+    profiler.watch(pygame.display, "update", "display.update")
+
+def draw_profiler_overlay(surface, profiler, rect=PROFILER_RECT):
+    """Gráfico rolante do tempo por quadro + percentis e médias por seção."""
+    pygame.draw.rect(surface, (0, 0, 0), rect)
+    graph_bottom = rect.y + 4 + PROFILER_GRAPH_HEIGHT
+    totals = profiler.totals()[-(rect.width - 8):]
+    for i, total in enumerate(totals):
+        height = min(PROFILER_GRAPH_HEIGHT, int(total * 1000 / PROFILER_MS_PER_PIXEL))
+        color = GREEN_MATCH if total * 1000 <= 1000 / FPS else RED_ERROR
+        x = rect.x + 4 + i
+        pygame.draw.line(surface, color, (x, graph_bottom), (x, graph_bottom - height))
+    # Linha do orçamento de um quadro
+    budget_y = graph_bottom - int(1000 / FPS / PROFILER_MS_PER_PIXEL)
+    if budget_y > rect.y:
+        pygame.draw.line(surface, GOLD_WIN, (rect.x + 4, budget_y), (rect.right - 4, budget_y))
+
+    # Números mudam todo quadro: render direto, sem passar pelo text_cache
+    p50, p95, p99 = (value * 1000 for value in profiler.stats())
+    lines = [f"quadro p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms"]
+    means = sorted(profiler.means().items(), key=lambda item: -item[1])
+    lines += [f"{label}: {value * 1000:.2f} ms" for label, value in means[:PROFILER_LINES]]
+    y = graph_bottom + 6
+    for line in lines:
+        text = get_font("small").render(line, True, WHITE)
+        surface.blit(text, (rect.x + 4, y))
+        y += text.get_height() + 2
 
 # --- Loop Principal (ATUALIZADO) ---
 
-def main():
+def main(rows=GRID_ROWS, cols=GRID_COLS, level=None, fps=FPS, vsync=False, seed=None):
+    """
+    'level' é um levels.Level; sem ele, a partida livre do Nível 1.
+    'fps' limita os quadros por segundo (0 = sem limite) e 'vsync' pede
+    sincronia com o monitor. 'seed' fixa a semente da partida livre.
+    """
+    bootstrap(vsync)
+    # Com o atlas, peças e textos do primeiro quadro não abrem fonte nenhuma
+    atlas_loaded = load_sprite_atlas()
     running = True
-    board = create_board(GRID_ROWS, GRID_COLS)
+    if level is not None:
+        # Tudo vem pronto do pacote: nada é sorteado nem validado aqui
+        rows, cols = level.rows, level.cols
+        numbers = level.numbers
+        starting_moves, target_score = level.starting_moves, level.target_score
+        refill_strategy = REFILL_STRATEGIES[level.refill]
+        seed, rng = new_game_rng(level.seed)
+        board = level.new_board()
+    else:
+        numbers = None
+        starting_moves, target_score = STARTING_MOVES, TARGET_SCORE
+        refill_strategy = REFILL_STRATEGIES[REFILL_STRATEGY]
+        seed, rng = new_game_rng(seed)
+        board = create_board(rows, cols, rng=rng)
+    replay = Replay(seed, rows, cols, starting_moves, target_score,
+                    level=level.number if level else 0)
+    viewport = Viewport(rows, cols)
+    renderer = DirtyRenderer(screen, game_surface, target_score)
+    timeline = Timeline()
+    view = BoardView(target_score)
+    # "Dica" mostra na hora uma troca válida e pede ao solver, em segundo
+    # plano, a melhor troca; ela substitui a dica quando chegar
+    solver = BackgroundSolver() if rows * cols <= SOLVER_MAX_CELLS else None
+    best_move_request = None
+    board_version = 0
+    # A dica rápida e o "sem jogadas" são calculados em segundo plano a cada
+    # versão do tabuleiro; hint_result é o último (versão, dica) recebido
+    hints = HintWorker(numbers)
+    hint_request = hints.request(board, board_version)
+    hint_result = None
+    profiler = FrameProfiler()
+    watch_hot_paths(profiler)
+    profile_path = os.environ.get("CALCULOCRUSH_PROFILE")
+    if profile_path:
+        profiler.enable()
+    show_profiler = False
     
     score = 0
-    moves_left = STARTING_MOVES
+    moves_left = starting_moves
     game_over = False
     won = False
     
     selected_piece = None 
     is_dragging = False   
-    drag_pos = (0, 0)
+    press_pos = drag_pos = (0, 0)
     hint_to_show = None
-    trigger_combo_loop = False 
-    game_state = "IDLE" 
+    hint_clicked = False  # "Dica" clicada, esperando o resultado em segundo plano
+    # Trocas feitas durante animações esperam aqui (com o instante do gesto)
+    gestures = GestureQueue()
+    # Desfazer (Ctrl+Z ou Backspace): antes de cada troca válida guarda as
+    # casas que mudaram e (pontos, movimentos, trocas gravadas, gerador)
+    history = BoardHistory()
+    undo_requested = 0  # Pedidos que esperam a animação acabar
 
     while running:
-        clock.tick(FPS)
-        
-        score_data = {
-            "score": score, "moves": moves_left, "game_over": game_over, 
-            "won": won, "hint_to_show": hint_to_show
-        }
+        # Os eventos são lidos logo no início do quadro (a espera do clock
+        # fica no fim): o gesto entra no quadro que está sendo montado
+        profiler.begin_frame()
+        now = pygame.time.get_ticks()
         
         # --- 1. Processamento de Eventos ---
-        for event in pygame.event.get():
+        # A fila de eventos é sempre atendida, mesmo durante animações;
+        # movimentos seguidos do mouse chegam como um só
+        for event in coalesce_motion(pygame.event.get()):
             if event.type == pygame.QUIT: running = False
+            if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                renderer.invalidate()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE: running = False
+                elif event.key == pygame.K_BACKSPACE or (
+                        event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL):
+                    undo_requested += 1
+                    gestures.clear()  # Trocas feitas antes miravam o tabuleiro a desfazer
+                elif event.key == PROFILER_KEY:
+                    show_profiler = not show_profiler
+                    if show_profiler:
+                        profiler.enable()
+                    elif not profile_path:
+                        profiler.disable()
+                    renderer.invalidate()
+                # Rolagem (setas) e zoom (+/-) valem até durante animações
+                elif event.key == pygame.K_LEFT: viewport.scroll(-SCROLL_STEP, 0)
+                elif event.key == pygame.K_RIGHT: viewport.scroll(SCROLL_STEP, 0)
+                elif event.key == pygame.K_UP: viewport.scroll(0, -SCROLL_STEP)
+                elif event.key == pygame.K_DOWN: viewport.scroll(0, SCROLL_STEP)
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    viewport.set_zoom(viewport.zoom * ZOOM_STEP)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    viewport.set_zoom(viewport.zoom / ZOOM_STEP)
+            if event.type == pygame.MOUSEWHEEL:
+                # Roda: rola; Ctrl + roda: zoom em torno do mouse
+                mx, my = pygame.mouse.get_pos()
+                if pygame.key.get_mods() & pygame.KMOD_CTRL:
+                    anchor = (mx - GAME_AREA_X_OFFSET, my - GAME_AREA_Y_OFFSET)
+                    viewport.set_zoom(viewport.zoom * ZOOM_STEP ** event.y, anchor)
+                else:
+                    viewport.scroll(event.x * SCROLL_STEP, -event.y * SCROLL_STEP)
             
-            if game_over or game_state != "IDLE": continue
+            if game_over: continue
 
             if event.type == pygame.MOUSEBUTTONDOWN:
-                clicked_grid_pos = get_clicked_pos(event.pos)
+                if event.button > 3: continue  # Roda do mouse (tratada em MOUSEWHEEL)
+                clicked_grid_pos = get_clicked_pos(event.pos, viewport)
                 
                 # --- ATUALIZADO: Verifica o clique no botão de Dica ---
                 # Ajusta as coordenadas do mouse para checar contra o HINT_RECT
@@ -511,35 +1005,21 @@ def main():
                 if clicked_grid_pos:
                     selected_piece = clicked_grid_pos
                     is_dragging = True
-                    drag_pos = event.pos
+                    press_pos = drag_pos = event.pos
+                elif timeline.busy:
+                    pass  # O botão de Dica só vale com o tabuleiro parado
                 elif HINT_BUTTON_RECT.collidepoint((adj_x, adj_y)):
-                    hint_move = find_hint(board)
-                    if hint_move:
-                        hint_to_show = hint_move[0] 
+                    # A dica aparece na fase de lógica, assim que o
+                    # resultado da versão atual estiver pronto (sem esperar)
+                    hint_clicked = True
             
-            if event.type == pygame.MOUSEBUTTONUP:
+            if event.type == pygame.MOUSEBUTTONUP and event.button <= 3:
                 if is_dragging and selected_piece:
-                    release_grid_pos = get_clicked_pos(event.pos)
-                    
-                    if release_grid_pos and release_grid_pos != selected_piece:
-                        is_adjacent = abs(selected_piece[0] - release_grid_pos[0]) + \
-                                      abs(selected_piece[1] - release_grid_pos[1]) == 1
-                        
-                        if is_adjacent:
-                            game_state = "ANIMATING"
-                            is_valid = is_swap_valid(board, selected_piece, release_grid_pos)
-                            
-                            # ATUALIZADO: Passa a 'game_surface' para a animação
-                            animate_swap(game_surface, board, selected_piece, 
-                                         release_grid_pos, is_valid, score_data)
-                            
-                            if is_valid:
-                                swap_pieces(board, selected_piece, release_grid_pos)
-                                moves_left -= 1
-                                trigger_combo_loop = True
-                                hint_to_show = None 
-                            game_state = "IDLE"
-                                
+                    release_grid_pos = get_clicked_pos(event.pos, viewport)
+                    target = swap_target(selected_piece, release_grid_pos, press_pos,
+                                         event.pos, viewport.cell_size, rows, cols)
+                    if target:
+                        gestures.push(selected_piece, target, now)
                 is_dragging = False
                 selected_piece = None
             
@@ -547,45 +1027,166 @@ def main():
                 if is_dragging:
                     drag_pos = event.pos
 
-        # --- 2. Lógica do Jogo (Loop de Combo) ---
-        if trigger_combo_loop and game_state == "IDLE":
-            game_state = "ANIMATING"
-            # ATUALIZADO: Passa a 'game_surface'
-            score_gain = run_combo_loop(game_surface, board, score, moves_left)
-            score += score_gain
-            
-            if moves_left <= 0:
-                game_over = True
-                won = (score >= TARGET_SCORE)
+        profiler.lap("events")
+
+        # --- 2. Lógica do Jogo: resolve tudo agora ---
+        # Uma troca por vez: a que foi feita durante a animação anterior é
+        # jogada assim que ela termina. A cascata inteira é calculada de uma
+        # vez; a animação só mostra os passos depois.
+        # Desfazer só com o tabuleiro parado, e antes das trocas da fila (as
+        # que sobraram foram feitas depois do pedido). O gerador volta junto,
+        # então o replay (sem as trocas desfeitas) continua igual
+        if undo_requested and not timeline.busy:
+            while undo_requested and history and not game_over:
+                undo_requested -= 1
+                score, moves_left, recorded, rng_state = history.restore(board)
+                restore_rng(rng, rng_state)
+                del replay.moves[recorded:]
+                board_version += 1
+                best_move_request = None
+                hint_to_show = None
+                hint_request = hints.request(board, board_version)
+            undo_requested = 0
+
+        gesture = None if game_over or timeline.busy else gestures.pop()
+        if gesture:
+            pos1, pos2, _ = gesture
+            is_valid = is_swap_valid(board, pos1, pos2)
+            queue_swap_animation(timeline, view, board, pos1, pos2, is_valid,
+                                 score, moves_left)
             
-            trigger_combo_loop = False
-            game_state = "IDLE"
+            if is_valid:
+                history.save(board, (score, moves_left, len(replay.moves), pack_rng(rng)))
+                replay.record(pos1, pos2)
+                board_version += 1
+                best_move_request = None
+                moves_left -= 1
+                hint_to_show = None 
+                hint_clicked = False
+                
+                # Uma cópia por jogada: a animação reconstrói
+                # os passos nela a partir da linha do tempo
+                shown = [list(row) for row in board]
+                swap_pieces(shown, pos1, pos2)
+                # Varredura completa, como no combo original: também
+                # limpa combinações que já vieram no tabuleiro inicial
+                steps = apply_swap_events(board, pos1, pos2, numbers=numbers,
+                                          rng=rng, strategy=refill_strategy)
+                # A cascata já assentou: a próxima dica começa
+                # a ser calculada enquanto a animação roda
+                hint_request = hints.request(board, board_version)
+                queue_cascade_animation(timeline, view, shown, steps,
+                                        score, moves_left)
+                score += sum(step.score_gain for step in steps)
+                
+                if moves_left <= 0:
+                    game_over = True
+                    won = (score >= target_score)
+                    replay.score = score
+                    save_replay(replay)
+                    gestures.clear()
+
+        # Dica pré-calculada; dica None = sem jogadas, então embaralha (com o
+        # rng da partida, para o replay repetir) assim que a animação acabar
+        if hint_request is not None and hint_request.done():
+            hint_result = hint_request.result() or hint_result
+            hint_request = None
+        if hint_clicked and hint_request is None:
+            hint_clicked = False
+            if hint_result and hint_result[0] == board_version and hint_result[1]:
+                hint_to_show = hint_result[1][0]
+                viewport.reveal(*hint_to_show)
+                if solver:
+                    best_move_request = (board_version, solver.request(board))
+        if (hint_result and hint_result[0] == board_version and hint_result[1] is None
+                and not game_over and not timeline.busy):
+            if shuffle_board(board, numbers, rng):
+                board_version += 1
+                hint_to_show = None
+                # Tudo o que está na fila mirava o tabuleiro de antes
+                gestures.clear()
+                hint_request = hints.request(board, board_version)
+            else:
+                hint_result = None  # Nem embaralhando: o jogo trava, como antes
+
+        # Melhor lance do solver (só vale se o tabuleiro não mudou)
+        if best_move_request and best_move_request[1].done():
+            version, future = best_move_request
+            best_move_request = None
+            if version == board_version and not future.cancelled():
+                best_move = future.result()[0]
+                if best_move:
+                    hint_to_show = best_move[0]
+                    viewport.reveal(*hint_to_show)
         
-        # --- 3. Desenho (Renderização) ---
+        # --- 3. Animações ---
+        timeline.update(now)
         
-        # Só redesenha a tela estática se estiver IDLE
-        if game_state == "IDLE":
-            # 1. Desenha os "enfeites" da janela
-            draw_window_decorations(screen)
-            
-            # 2. Desenha o jogo estático na surface
-            update_game_surface(game_surface, board, **score_data)
-            
-            # 3. Blit a surface do jogo na tela principal
-            screen.blit(game_surface, (GAME_AREA_X_OFFSET, GAME_AREA_Y_OFFSET))
-            
-            # 4. Desenha a peça sendo arrastada (na tela principal)
-            if is_dragging and selected_piece:
-                r, c = selected_piece
-                number = board[r][c]
-                # Desenha na posição do mouse
-                draw_piece(screen, number, drag_pos[0] - BLOCK_SIZE // 2, 
-                           drag_pos[1] - BLOCK_SIZE // 2, border_color=RED_ERROR)
-
-            # 5. Atualiza a tela
-            pygame.display.flip()
+        profiler.lap("logic")
+
+        # --- 4. Desenho (Renderização) ---
+        score_data = {
+            "score": score, "moves": moves_left, "game_over": game_over, 
+            "won": won, "hint_to_show": hint_to_show
+        }
+        if timeline.busy:
+            draw_animation_frame(game_surface, view, viewport)
+            renderer.invalidate() # O quadro de animação desenhou por fora
+        else:
+            # Parado: redesenha só o que mudou
+            drag = (selected_piece, drag_pos) if is_dragging and selected_piece else None
+            renderer.render(board, **score_data, drag=drag, viewport=viewport)
+        profiler.lap("draw")
+
+        if show_profiler:
+            # Recompõe o que estava embaixo e desenha o overlay por cima
+            renderer.restore(PROFILER_RECT)
+            draw_profiler_overlay(screen, profiler)
+            pygame.display.update(PROFILER_RECT)
+            profiler.lap("overlay")
+        # Espera do limite de quadros (fps 0: sem espera; com vsync, a
+        # própria troca de tela já segura o ritmo)
+        clock.tick(fps)
+        profiler.lap("tick")
+        profiler.end_frame()
 
+    if not game_over:
+        replay.score = score
+        save_replay(replay)
+    if solver:
+        solver.shutdown()
+    hints.shutdown()
+    if profile_path:
+        profiler.disable()
+        print(f"Perfil salvo em {profiler.dump(profile_path)}")
+    if not atlas_loaded:
+        save_sprite_atlas()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="CalculoCrush")
+    parser.add_argument("--rows", type=int, default=GRID_ROWS)
+    parser.add_argument("--cols", type=int, default=GRID_COLS)
+    parser.add_argument("--marathon", action="store_true",
+                        help=f"modo maratona: tabuleiro de {MARATHON_SIZE}x{MARATHON_SIZE}")
+    parser.add_argument("--level", type=int, help="joga um nível do pacote (começa em 1)")
+    parser.add_argument("--levels", default=DEFAULT_PACK, help="arquivo do pacote de níveis")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="limite de quadros por segundo (0 = sem limite)")
+    parser.add_argument("--vsync", action="store_true", help="sincroniza com o monitor")
+    args = parser.parse_args()
+    try:
+        seed = seed_from_env()
+    except ValueError as error:
+        parser.error(str(error))
+    options = {"fps": args.fps, "vsync": args.vsync, "seed": seed}
+    if args.level is not None:
+        try:
+            level = get_level(args.level, args.levels)
+        except LevelError as error:
+            parser.error(str(error))
+        main(level=level, **options)
+    elif args.marathon:
+        main(MARATHON_SIZE, MARATHON_SIZE, **options)
+    else:
+        main(args.rows, args.cols, **options)
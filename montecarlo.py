@@ -0,0 +1,251 @@
+# --- Harness de Monte Carlo (multiprocesso) ---
+# Espalha milhões de partidas simuladas por um pool de processos para
+# comparar distribuições de peças. Cada pedaço de trabalho ("chunk") tem
+# sua própria semente, derivada de (semente base, candidata, índice), então
+# o resultado não depende de quantos processos rodam nem da ordem.
+# Os agregados parciais vão para um arquivo de checkpoint; rodar de novo com
+# o mesmo --checkpoint continua de onde parou; o checkpoint guarda os
+# parâmetros da execução e só é retomado com os mesmos. Exemplo:
+#   python montecarlo.py --candidates cands.json --games 200000 --checkpoint run.json
+#
+# Formato de --candidates: lista JSON de {"name": ..., "numbers": {valor: peso}}.
+import argparse
+import json
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from atomicfile import atomic_write
+from engine import (
+    EASY_NUMBERS_LIST, GRID_COLS, GRID_ROWS, STARTING_MOVES, TARGET_SCORE, new_game_rng,
+)
+from simulate import POLICIES, play_game
+
+SCORE_BUCKET = 10   # Largura das faixas do histograma de pontos
+CHUNK_GAMES = 500   # Partidas por tarefa enviada ao pool
+
+
+class CheckpointError(ValueError):
+    """Checkpoint de outra execução (parâmetros diferentes)."""
+
+# --- Candidatas ---
+def expand_distribution(weights):
+    """{valor: peso} -> lista de números, no formato de EASY_NUMBERS_LIST."""
+    numbers = []
+    for value, count in sorted(weights.items(), key=lambda item: int(item[0])):
+        numbers.extend([int(value)] * int(count))
+    return numbers
+
+def default_candidate():
+    return {"name": "padrao", "numbers": dict(Counter(EASY_NUMBERS_LIST))}
+
+def perturbed_candidates(base, count, seed):
+    """Gera variações aleatórias (peso ±50%) da distribuição base."""
+    rng = random.Random(f"perturb:{seed}")
+    candidates = []
+    for i in range(count):
+        weights = {
+            value: max(1, round(weight * rng.uniform(0.5, 1.5)))
+            for value, weight in sorted(base["numbers"].items(), key=lambda item: int(item[0]))
+        }
+        candidates.append({"name": f"{base['name']}-{i:03d}", "numbers": weights})
+    return candidates
+
+# --- Agregados ---
+def empty_aggregate():
+    return {"games": 0, "wins": 0, "stalls": 0, "score_sum": 0,
+            "score_hist": {}, "depth_hist": {}}
+
+def merge_aggregate(total, part):
+    total["games"] += part["games"]
+    total["score_sum"] += part["score_sum"]
+    total["wins"] += part["wins"]
+    total["stalls"] += part["stalls"]
+    for key in ("score_hist", "depth_hist"):
+        hist = total[key]
+        for bucket, count in part[key].items():
+            hist[bucket] = hist.get(bucket, 0) + count
+    return total
+
+def summarize_aggregate(agg):
+    games = agg["games"] or 1
+    scores = sorted((int(bucket), count) for bucket, count in agg["score_hist"].items())
+    depths = agg["depth_hist"]
+    total_steps = sum(depths.values()) or 1
+
+    def score_percentile(pct):
+        limit = agg["games"] * pct / 100
+        seen = 0
+        for bucket, count in scores:
+            seen += count
+            if seen >= limit:
+                return bucket
+        return 0
+
+    return {
+        "games": agg["games"],
+        "win_rate": agg["wins"] / games,
+        "stall_rate": agg["stalls"] / games,
+        "score_mean": agg["score_sum"] / games,
+        "score_p10": score_percentile(10),
+        "score_p50": score_percentile(50),
+        "score_p90": score_percentile(90),
+        "cascade_depth_mean": sum(int(d) * n for d, n in depths.items()) / total_steps,
+        "cascade_depth_max": max((int(d) for d in depths), default=0),
+    }
+
+# --- Trabalho de cada processo ---
+def chunk_seed(base_seed, name, chunk):
+    # Semear com string é determinístico (usa hash SHA-512 internamente)
+    return random.Random(f"{base_seed}:{name}:{chunk}").getrandbits(64)
+
+def run_chunk(candidate, chunk, games, seed, policy_name, rows, cols,
+              starting_moves, target_score):
+    """Executado no processo filho: joga 'games' partidas e devolve o agregado."""
+    _, rng = new_game_rng(seed)
+    policy = POLICIES[policy_name]
+    numbers = expand_distribution(candidate["numbers"])
+
+    agg = empty_aggregate()
+    score_hist = Counter()
+    depth_hist = Counter()
+    for _ in range(games):
+        result = play_game(policy, rows, cols, starting_moves, target_score, rng, numbers)
+        agg["games"] += 1
+        agg["wins"] += result["won"]
+        agg["stalls"] += result["stalled"]
+        agg["score_sum"] += result["score"]
+        score_hist[str(result["score"] // SCORE_BUCKET * SCORE_BUCKET)] += 1
+        depth_hist.update(str(d) for d in result["cascade_depths"])
+    agg["score_hist"] = dict(score_hist)
+    agg["depth_hist"] = dict(depth_hist)
+    return candidate["name"], chunk, agg
+
+# --- Checkpoint ---
+def load_checkpoint(path, params):
+    """
+    Estado salvo em 'path', ou um estado novo. 'params' são os parâmetros
+    da execução; um checkpoint feito com outros não é misturado.
+    """
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        saved = state.get("params") or {}
+        differing = sorted(key for key in params if saved.get(key) != params[key])
+        if differing:
+            raise CheckpointError(f"{path} foi gravado com outros parâmetros "
+                                  f"({', '.join(differing)}); use outro --checkpoint")
+        return state
+    return {"params": params, "done": [], "aggregates": {}}
+
+def save_checkpoint(path, state):
+    if not path:
+        return
+    atomic_write(path, json.dumps(state))
+
+# --- Execução ---
+def run(candidates, games, policy_name="greedy", workers=None, base_seed=0,
+        rows=GRID_ROWS, cols=GRID_COLS, starting_moves=STARTING_MOVES,
+        target_score=TARGET_SCORE, checkpoint=None, on_progress=None):
+    """
+    Roda 'games' partidas por candidata e devolve {nome: agregado}.
+    Pedaços já presentes no checkpoint são pulados.
+    """
+    params = {
+        "games": games, "policy": policy_name, "seed": base_seed, "rows": rows,
+        "cols": cols, "moves": starting_moves, "target": target_score,
+        "chunk_games": CHUNK_GAMES, "score_bucket": SCORE_BUCKET,
+        # Chaves em texto: é como elas voltam do JSON
+        "candidates": {candidate["name"]: {str(value): int(weight)
+                                           for value, weight in candidate["numbers"].items()}
+                       for candidate in candidates},
+    }
+    state = load_checkpoint(checkpoint, params)
+    done = {tuple(key) for key in state["done"]}
+    aggregates = state["aggregates"]
+
+    tasks = []
+    for candidate in candidates:
+        aggregates.setdefault(candidate["name"], empty_aggregate())
+        chunks = (games + CHUNK_GAMES - 1) // CHUNK_GAMES
+        for chunk in range(chunks):
+            if (candidate["name"], chunk) in done:
+                continue
+            chunk_games = min(CHUNK_GAMES, games - chunk * CHUNK_GAMES)
+            tasks.append((candidate, chunk, chunk_games,
+                          chunk_seed(base_seed, candidate["name"], chunk)))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_chunk, candidate, chunk, chunk_games, seed, policy_name,
+                        rows, cols, starting_moves, target_score)
+            for candidate, chunk, chunk_games, seed in tasks
+        ]
+        try:
+            for future in as_completed(futures):
+                name, chunk, agg = future.result()
+                merge_aggregate(aggregates[name], agg)
+                state["done"].append([name, chunk])
+                save_checkpoint(checkpoint, state)
+                if on_progress:
+                    on_progress(len(state["done"]), name, aggregates[name])
+        except KeyboardInterrupt:
+            # O que já terminou está no checkpoint; o resto roda na próxima vez
+            for future in futures:
+                future.cancel()
+            raise
+
+    return aggregates
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo de balanceamento do CalculoCrush")
+    parser.add_argument("--candidates", help="arquivo JSON com as distribuições candidatas")
+    parser.add_argument("--perturb", type=int, default=0,
+                        help="gera N variações aleatórias da distribuição padrão")
+    parser.add_argument("--games", type=int, default=10000, help="partidas por candidata")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows", type=int, default=GRID_ROWS)
+    parser.add_argument("--cols", type=int, default=GRID_COLS)
+    parser.add_argument("--moves", type=int, default=STARTING_MOVES)
+    parser.add_argument("--target", type=int, default=TARGET_SCORE)
+    parser.add_argument("--checkpoint", help="arquivo de agregados parciais (retomável)")
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args(argv)
+
+    if args.candidates:
+        with open(args.candidates, encoding="utf-8") as f:
+            candidates = json.load(f)
+    else:
+        candidates = [default_candidate()]
+    if args.perturb:
+        candidates += perturbed_candidates(default_candidate(), args.perturb, args.seed)
+
+    def progress(done_chunks, name, agg):
+        if not args.json:
+            print(f"[{done_chunks}] {name}: {agg['games']} partidas", flush=True)
+
+    try:
+        aggregates = run(candidates, args.games, args.policy, args.workers, args.seed,
+                         args.rows, args.cols, args.moves, args.target,
+                         args.checkpoint, progress)
+    except CheckpointError as error:
+        parser.error(str(error))
+    summaries = {
+        candidate["name"]: summarize_aggregate(aggregates[candidate["name"]])
+        for candidate in candidates
+    }
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        ranking = sorted(summaries.items(), key=lambda item: -item[1]["win_rate"])
+        for name, summary in ranking:
+            print(f"{name:>16}: vitórias {summary['win_rate']:.1%}  "
+                  f"pontos p50 {summary['score_p50']}  "
+                  f"cascata média {summary['cascade_depth_mean']:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# --- Perfil de Quadros ---
+# Mede quanto cada quadro gasta em cada fase do loop (laps sequenciais:
+# espera do clock, eventos, lógica, desenho...) e nas rotinas quentes
+# instrumentadas (find_matches, drop_pieces, draw_piece, display.flip...).
+# As rotinas são medidas de forma inclusiva, por dentro das fases, e só
+# na thread que liga o perfil (a do loop): chamadas das threads de dica e do
+# solver não são tempo do quadro.
+# Sem pygame: main.py desenha o overlay, este módulo só coleta e exporta.
+#   CSV:          um quadro por linha, uma coluna (ms) por seção
+#   Chrome trace: JSON para chrome://tracing ou https://ui.perfetto.dev
+
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+FRAME_HISTORY = 600      # Quadros guardados (10 s a 60 FPS)
+MAX_SPANS = 200_000      # Intervalos guardados para o trace
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index]
+
+
+class FrameProfiler:
+    """
+    Uso por quadro: begin_frame(), lap("fase") ao fim de cada fase, e
+    end_frame(). Desligado (enabled = False), tudo isso quase não custa nada
+    e as rotinas instrumentadas voltam às originais.
+    """
+
+    def __init__(self, history=FRAME_HISTORY, max_spans=MAX_SPANS):
+        self.enabled = False
+        self.frames = deque(maxlen=history)  # dict seção -> segundos, por quadro
+        self.spans = deque(maxlen=max_spans)  # (nome, início, duração) para o trace
+        self.sections = []                   # Ordem em que as seções apareceram
+        self._origin = time.perf_counter()
+        self._current = None
+        self._frame_start = 0.0
+        self._lap_start = 0.0
+        self._thread = None  # Thread do loop (a que chamou enable)
+        self._targets = []   # (objeto, atributo, rótulo) a instrumentar
+        self._patches = []   # (objeto, atributo, original) enquanto ligado
+
+    # --- Liga/desliga ---
+    def watch(self, owner, name, label=None):
+        """Registra owner.name como rotina quente (instrumentada ao ligar)."""
+        self._targets.append((owner, name, label or name))
+        if self.enabled:
+            self._patch(owner, name, label or name)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._thread = threading.get_ident()
+        for owner, name, label in self._targets:
+            self._patch(owner, name, label)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._current = None
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+        self._patches.clear()
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    def _patch(self, owner, name, label):
+        original = getattr(owner, name)
+        perf_counter = time.perf_counter
+        get_ident = threading.get_ident
+
+        def timed(*args, **kwargs):
+            if get_ident() != self._thread:
+                return original(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._record(label, start, perf_counter())
+
+        setattr(owner, name, timed)
+        self._patches.append((owner, name, original))
+
+    # --- Coleta ---
+    def _record(self, label, start, end):
+        frame = self._current
+        if frame is None:
+            return  # Fora de um quadro
+        if label not in frame:
+            frame[label] = 0.0
+            if label not in self.sections:
+                self.sections.append(label)
+        frame[label] += end - start
+        self.spans.append((label, start, end - start))
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._current = {}
+        self._frame_start = self._lap_start = now
+
+    def lap(self, label):
+        """Fecha a fase atual do quadro (do lap anterior até agora)."""
+        if self._current is None:
+            return
+        now = time.perf_counter()
+        self._record(label, self._lap_start, now)
+        self._lap_start = now
+
+    def end_frame(self):
+        frame = self._current
+        if frame is None:
+            return
+        now = time.perf_counter()
+        self._current = None
+        frame["total"] = now - self._frame_start
+        self.frames.append(frame)
+        self.spans.append(("frame", self._frame_start, frame["total"]))
+
+    # --- Estatísticas ---
+    def totals(self):
+        return [frame["total"] for frame in self.frames]
+
+    def stats(self, label="total"):
+        """(p50, p95, p99) em segundos da seção nos quadros guardados."""
+        values = [frame.get(label, 0.0) for frame in self.frames]
+        return tuple(percentile(values, pct) for pct in (50, 95, 99))
+
+    def means(self):
+        """Média por quadro (segundos) de cada seção, na ordem de aparição."""
+        count = len(self.frames) or 1
+        return {label: sum(frame.get(label, 0.0) for frame in self.frames) / count
+                for label in self.sections}
+
+    # --- Exportação ---
+    def write_csv(self, path):
+        columns = ["total"] + self.sections
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_ms" for name in columns])
+            for i, frame in enumerate(self.frames):
+                writer.writerow([i] + [f"{frame.get(name, 0.0) * 1000:.3f}" for name in columns])
+
+    def write_chrome_trace(self, path):
+        events = [{
+            "name": name, "ph": "X", "pid": 1, "tid": 1,
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+        } for name, start, duration in self.spans]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def dump(self, path):
+        """Grava em Chrome trace se o arquivo terminar em .json; senão em CSV."""
+        if path.endswith(".json"):
+            self.write_chrome_trace(path)
+        else:
+            self.write_csv(path)
+        return path
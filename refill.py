@@ -0,0 +1,113 @@
+# --- Reposição Dirigida ---
+# Estratégias para sortear as peças novas de refill_board. Com tabelas de
+# produtos e fatores pré-calculadas, cada casa sabe na hora quais valores
+# fechariam uma trinca com os vizinhos já preenchidos (a*b == c em qualquer
+# das posições), e a estratégia aumenta ou zera o peso desses valores.
+# O custo por peça é limitado: no máximo 6 trincas consultadas e um sorteio
+# ponderado sobre os valores distintos da distribuição.
+# Este módulo não importa o engine: as estratégias só leem o tabuleiro.
+from collections import Counter
+from itertools import accumulate
+
+
+class ProductTable:
+    """Produtos e fatores de um conjunto de valores (só os que existem nele)."""
+
+    def __init__(self, numbers):
+        counts = Counter(numbers)
+        self.values = sorted(counts)
+        self.weights = [counts[value] for value in self.values]
+        value_set = set(self.values)
+        self.product = {}  # (a, b) -> c, com a*b == c
+        self.first = {}    # (b, c) -> a
+        self.middle = {}   # (a, c) -> b
+        for a in self.values:
+            for b in self.values:
+                c = a * b
+                if c in value_set:
+                    self.product[(a, b)] = c
+                    self.first[(b, c)] = a
+                    self.middle[(a, c)] = b
+        self.triples = sorted((a, b, c) for (a, b), c in self.product.items())
+
+    def completing(self, board, r, c):
+        """Valores que, postos em (r, c), fecham uma trinca com casas já preenchidas."""
+        rows = len(board); cols = len(board[0])
+        product = self.product; first = self.first; middle = self.middle
+        found = set()
+        row = board[r]
+        # Horizontal: (r, c) como terceira, segunda ou primeira casa da trinca
+        if c >= 2 and row[c - 2] and row[c - 1]:
+            found.add(product.get((row[c - 2], row[c - 1])))
+        if 1 <= c < cols - 1 and row[c - 1] and row[c + 1]:
+            found.add(middle.get((row[c - 1], row[c + 1])))
+        if c < cols - 2 and row[c + 1] and row[c + 2]:
+            found.add(first.get((row[c + 1], row[c + 2])))
+        # Vertical
+        if r >= 2 and board[r - 2][c] and board[r - 1][c]:
+            found.add(product.get((board[r - 2][c], board[r - 1][c])))
+        if 1 <= r < rows - 1 and board[r - 1][c] and board[r + 1][c]:
+            found.add(middle.get((board[r - 1][c], board[r + 1][c])))
+        if r < rows - 2 and board[r + 1][c] and board[r + 2][c]:
+            found.add(first.get((board[r + 1][c], board[r + 2][c])))
+        found.discard(None)
+        return found
+
+
+class RandomRefill:
+    """Sorteio simples da distribuição (o comportamento original)."""
+
+    def pick(self, board, r, c, numbers, rng):
+        return rng.choice(numbers)
+
+
+class MatchBiasRefill:
+    """
+    Multiplica por 'match_weight' o peso dos valores que fecham uma trinca
+    na hora: 0 evita combinações (nada de cascata de graça), 1 é neutro e
+    valores maiores favorecem cascatas.
+    """
+
+    def __init__(self, match_weight):
+        self.match_weight = match_weight
+        self._numbers = None
+        self._table = None
+        self._cum_weights = {}  # Valores que fecham trinca -> pesos acumulados
+
+    def table(self, numbers):
+        # Uma tabela por distribuição; trocar de lista (outro nível) refaz
+        if numbers is not self._numbers:
+            self._numbers = numbers
+            self._table = ProductTable(numbers)
+            self._cum_weights.clear()
+        return self._table
+
+    def _weights_for(self, completing):
+        key = frozenset(completing)
+        cum_weights = self._cum_weights.get(key)
+        if cum_weights is None:
+            table = self._table
+            weights = [weight * self.match_weight if value in key else weight
+                       for value, weight in zip(table.values, table.weights)]
+            if not any(weights):
+                weights = table.weights  # Só sobraram combinações: sorteio normal
+            cum_weights = list(accumulate(weights))
+            self._cum_weights[key] = cum_weights
+        return cum_weights
+
+    def pick(self, board, r, c, numbers, rng):
+        table = self.table(numbers)
+        completing = table.completing(board, r, c)
+        if not completing:
+            return rng.choice(numbers)
+        return rng.choices(table.values, cum_weights=self._weights_for(completing))[0]
+
+
+AVOID_MATCHES = MatchBiasRefill(0.0)
+
+# Estratégias por nome (é o que um nível guarda)
+REFILL_STRATEGIES = {
+    "random": RandomRefill(),
+    "avoid": AVOID_MATCHES,
+    "assist": MatchBiasRefill(4.0),
+}
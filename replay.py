@@ -0,0 +1,184 @@
+# --- Replays ---
+# Uma partida é só a semente + a sequência de trocas; o motor reproduz o
+# resto. O formato binário (.ccr) é:
+#   cabeçalho: "CCRP", versão (u8), linhas (u16), colunas (u16),
+#              movimentos iniciais (u16), meta (u32), semente (u64),
+#              pontuação final (u32, 0xFFFFFFFF = desconhecida), nº de trocas (u32),
+#              nível (u16, 0 = partida livre; a partir da versão 2)
+#   versão 3: grades acima de engine.SETTLED_BOARD_CELLS nascem assentadas;
+#              replays antigos dessas grades não se reproduzem mais
+#   trocas:    varint de (índice da casa * 2 + direção), direção 0 = direita, 1 = baixo
+# Para repetir replays em lote (sem janela, na velocidade máxima):
+#   python replay.py replays/*.ccr
+import argparse
+import struct
+import sys
+import time
+
+from engine import (
+    GRID_COLS, GRID_ROWS, REFILL_STRATEGY, SETTLED_BOARD_CELLS, STARTING_MOVES,
+    TARGET_SCORE, MoveIndex, apply_swap, create_board, new_game_rng, shuffle_board,
+)
+from levels import DEFAULT_PACK, LevelError, get_level
+from refill import REFILL_STRATEGIES
+
+MAGIC = b"CCRP"
+VERSION = 3
+HEADER = struct.Struct(">4sBHHHIQII")
+LEVEL_FIELD = struct.Struct(">H")  # Depois do cabeçalho, a partir da versão 2
+UNKNOWN_SCORE = 0xFFFFFFFF
+MAX_SEED = (1 << 64) - 1  # A semente vai num u64
+
+
+class ReplayError(ValueError):
+    """Arquivo de replay inválido ou partida que não se reproduz."""
+
+
+class Replay:
+    """Semente + trocas de uma partida: o suficiente para repeti-la."""
+
+    def __init__(self, seed, rows=GRID_ROWS, cols=GRID_COLS,
+                 starting_moves=STARTING_MOVES, target_score=TARGET_SCORE,
+                 moves=None, score=None, level=0, version=VERSION):
+        self.seed = seed
+        self.rows = rows
+        self.cols = cols
+        self.starting_moves = starting_moves
+        self.target_score = target_score
+        self.moves = list(moves or [])
+        self.score = score
+        self.level = level  # Número no pacote de níveis (0 = partida livre)
+        self.version = version  # Versão do formato em que foi gravado
+
+    def record(self, pos1, pos2):
+        self.moves.append((min(pos1, pos2), max(pos1, pos2)))
+
+    # --- Codificação ---
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(
+            MAGIC, VERSION, self.rows, self.cols, self.starting_moves,
+            self.target_score, self.seed,
+            UNKNOWN_SCORE if self.score is None else self.score, len(self.moves)))
+        out += LEVEL_FIELD.pack(self.level)
+        for (r1, c1), (r2, c2) in self.moves:
+            direction = 0 if r1 == r2 else 1
+            _write_varint(out, (r1 * self.cols + c1) * 2 + direction)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ReplayError("replay truncado")
+        (magic, version, rows, cols, starting_moves, target_score, seed,
+         score, count) = HEADER.unpack_from(data)
+        if magic != MAGIC or not 1 <= version <= VERSION:
+            raise ReplayError("não é um replay do CalculoCrush (ou versão desconhecida)")
+        if rows == 0 or cols == 0:
+            raise ReplayError("replay corrompido: grade vazia")
+        offset = HEADER.size
+        level = 0
+        if version >= 2:
+            if len(data) < offset + LEVEL_FIELD.size:
+                raise ReplayError("replay truncado")
+            (level,) = LEVEL_FIELD.unpack_from(data, offset)
+            offset += LEVEL_FIELD.size
+        moves = []
+        for _ in range(count):
+            value, offset = _read_varint(data, offset)
+            cell, direction = divmod(value, 2)
+            r, c = divmod(cell, cols)
+            moves.append(((r, c), (r + direction, c + 1 - direction)))
+        return cls(seed, rows, cols, starting_moves, target_score, moves,
+                   None if score == UNKNOWN_SCORE else score, level, version)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ReplayError("replay truncado")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+# --- Reprodução ---
+def simulate(replay, levels_path=DEFAULT_PACK):
+    """
+    Reproduz a partida sem janela e devolve a pontuação obtida.
+    Partidas de um nível pegam tabuleiro, distribuição e reposição do pacote.
+    Levanta ReplayError se alguma troca gravada não for válida.
+    """
+    _, rng = new_game_rng(replay.seed)
+    numbers = None
+    if replay.level:
+        try:
+            level = get_level(replay.level, levels_path)
+        except LevelError as error:
+            raise ReplayError(str(error)) from None
+        board = level.new_board()
+        numbers = level.numbers
+        strategy = REFILL_STRATEGIES[level.refill]
+    else:
+        if replay.version < 3 and replay.rows * replay.cols > SETTLED_BOARD_CELLS:
+            raise ReplayError(f"replay da versão {replay.version} numa grade acima de "
+                              f"{SETTLED_BOARD_CELLS} casas: o tabuleiro inicial mudou")
+        board = create_board(replay.rows, replay.cols, rng=rng)
+        strategy = REFILL_STRATEGIES[REFILL_STRATEGY]
+    move_index = MoveIndex(board)
+    score = 0
+    for i, (pos1, pos2) in enumerate(replay.moves):
+        # O jogo embaralha sozinho antes da jogada se o tabuleiro travou
+        if not move_index.has_moves():
+            shuffle_board(board, numbers, rng)
+            move_index.rebuild()
+        if not move_index.is_valid(pos1, pos2):
+            raise ReplayError(f"troca {i} inválida: {pos1} <-> {pos2}")
+        score_gain, _ = apply_swap(board, pos1, pos2, move_index, numbers, rng, strategy)
+        score += score_gain
+    return score
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduz replays do CalculoCrush")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--levels", default=DEFAULT_PACK,
+                        help="pacote de níveis (para replays de níveis)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    failures = 0
+    for path in args.files:
+        try:
+            replay = Replay.load(path)
+            score = simulate(replay, args.levels)
+        except (OSError, ReplayError) as error:
+            print(f"ERRO {path}: {error}")
+            failures += 1
+            continue
+        if replay.score is not None and score != replay.score:
+            print(f"DIVERGE {path}: gravado {replay.score}, reproduzido {score}")
+            failures += 1
+    elapsed = time.perf_counter() - start
+    print(f"{len(args.files)} replays em {elapsed:.2f}s, {failures} com problema")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
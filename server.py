@@ -0,0 +1,381 @@
+# --- Servidor de Partidas ---
+# Hospeda milhares de partidas independentes num processo só (asyncio), para
+# torneios e para conferir pontuações de um placar online. O protocolo é JSON
+# por linha, o mesmo no soquete local e na entrada padrão:
+#   {"id": 1, "cmd": "new", "seed": 42}                     -> game, board, ...
+#   {"id": 1, "cmd": "new", "level": 3}                     (nível do pacote)
+#   {"id": 2, "cmd": "swap", "game": 1, "from": [0, 0], "to": [0, 1]}
+#   {"id": 3, "cmd": "board", "game": 1}
+#   {"id": 4, "cmd": "close", "game": 1}
+#   {"id": 5, "cmd": "stats"}
+#   {"id": 6, "cmd": "checkpoint", "game": 1}               (guarda o estado)
+#   {"id": 7, "cmd": "rollback", "game": 1}                 (volta ao último)
+# Toda resposta repete o "id" do pedido e traz "ok"; erros vêm em "error".
+# A troca segue as regras do jogo (vizinhas e is_swap_valid) e a resposta
+# traz a cascata como linha do tempo de CascadeStep, que o cliente reaplica
+# no tabuleiro de antes com apply_cascade_step. Exemplos:
+#   python server.py --socket /tmp/calculocrush.sock
+#   python server.py --port 8765
+#   python server.py --stdin < pedidos.jsonl
+import argparse
+import asyncio
+import json
+import os
+import stat
+import sys
+from array import array
+
+from engine import (
+    GRID_COLS, GRID_ROWS, REFILL_STRATEGY, STARTING_MOVES, TARGET_SCORE, apply_swap_events,
+    create_board, find_hint, is_swap_valid, new_game_rng, shuffle_board,
+)
+from levels import DEFAULT_PACK, get_level
+from refill import REFILL_STRATEGIES
+from snapshot import BoardHistory, pack_rng, restore_rng
+
+MAX_GAMES = 100_000
+MAX_GRID = 64        # Lado máximo de uma partida hospedada
+MAX_LINE = 1 << 16   # Tamanho máximo de um pedido (bytes)
+MAX_CHECKPOINTS = 4  # Por partida; o mais antigo sai quando enche
+# Faixas dos campos numéricos (as mesmas do cabeçalho de um replay)
+MAX_MOVES = 0xFFFF
+MAX_TARGET = 0xFFFFFFFF
+MAX_SEED = (1 << 64) - 1
+MAX_LEVEL = 0xFFFF
+
+
+class ProtocolError(ValueError):
+    """Pedido malformado ou que não se aplica à partida."""
+
+
+def int_field(value, name, low, high):
+    """
+    'value' como inteiro em [low, high]. Aceita int, float inteiro ou texto;
+    NaN, infinito e números gigantes viram ProtocolError (nunca OverflowError).
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ProtocolError(f"{name} deve ser um número inteiro")
+    try:
+        number = int(value)
+    except (ValueError, OverflowError):
+        raise ProtocolError(f"{name} deve ser um número inteiro") from None
+    if isinstance(value, float) and number != value:
+        raise ProtocolError(f"{name} deve ser um número inteiro")
+    if not low <= number <= high:
+        raise ProtocolError(f"{name} deve estar entre {low} e {high}")
+    return number
+
+
+# --- Partida ---
+class GameSession:
+    """
+    Estado mínimo de uma partida: o tabuleiro fica compactado num array de
+    inteiros de 16 bits (128 bytes num 8x8) e só vira lista de listas durante
+    uma jogada. Com o gerador da partida (semente), é o mesmo jogo que o
+    replay.py reproduz. Os checkpoints (snapshot.BoardHistory) só existem
+    depois do primeiro pedido: cada um guarda as casas que mudaram e o
+    estado do gerador.
+    """
+
+    __slots__ = ("seed", "rows", "cols", "cells", "rng", "strategy", "numbers",
+                 "level", "score", "moves_left", "target_score", "moves_made",
+                 "history")
+
+    def __init__(self, seed=None, rows=GRID_ROWS, cols=GRID_COLS,
+                 starting_moves=STARTING_MOVES, target_score=TARGET_SCORE,
+                 strategy=REFILL_STRATEGY, level=None):
+        if level is not None:
+            seed, rows, cols = level.seed, level.rows, level.cols
+            starting_moves, target_score = level.starting_moves, level.target_score
+            strategy = level.refill
+        self.seed, self.rng = new_game_rng(seed)
+        self.rows = rows
+        self.cols = cols
+        self.strategy = REFILL_STRATEGIES[strategy]
+        # A distribuição é a lista do nível (compartilhada por todas as
+        # partidas dele), não uma cópia
+        self.numbers = level.numbers if level else None
+        self.level = level.number if level else 0
+        self.score = 0
+        self.moves_left = starting_moves
+        self.target_score = target_score
+        self.moves_made = 0
+        self.history = None
+        self.store(level.board if level else create_board(rows, cols, rng=self.rng))
+
+    def board(self):
+        cells = self.cells; cols = self.cols
+        return [cells[i:i + cols].tolist() for i in range(0, len(cells), cols)]
+
+    def store(self, board):
+        self.cells = array("H", [number for row in board for number in row])
+
+    @property
+    def game_over(self):
+        return self.moves_left <= 0
+
+    def swap(self, pos1, pos2):
+        """
+        Joga (pos1, pos2). Retorna (válida, passos, embaralhou); passos é a
+        lista de CascadeStep. Troca inválida não gasta movimento.
+        """
+        if self.game_over:
+            raise ProtocolError("partida encerrada")
+        (r1, c1), (r2, c2) = pos1, pos2
+        if not (0 <= r1 < self.rows and 0 <= c1 < self.cols
+                and 0 <= r2 < self.rows and 0 <= c2 < self.cols):
+            raise ProtocolError("casa fora do tabuleiro")
+        if abs(r1 - r2) + abs(c1 - c2) != 1:
+            return False, [], None
+        board = self.board()
+        reshuffled = None
+        if not is_swap_valid(board, pos1, pos2):
+            # Uma troca válida já prova que há jogadas; só a inválida paga a
+            # busca. Tabuleiro travado embaralha antes, como no jogo e no replay.
+            if find_hint(board) is not None:
+                return False, [], None
+            shuffle_board(board, self.numbers, self.rng)
+            self.store(board)
+            reshuffled = [list(row) for row in board]
+            if not is_swap_valid(board, pos1, pos2):
+                return False, [], reshuffled
+        steps = apply_swap_events(board, pos1, pos2, numbers=self.numbers, rng=self.rng,
+                                  strategy=self.strategy)
+        self.store(board)
+        self.moves_left -= 1
+        self.moves_made += 1
+        self.score += sum(step.score_gain for step in steps)
+        return True, steps, reshuffled
+
+    def checkpoint(self):
+        """Guarda o estado atual; retorna quantos checkpoints a partida tem."""
+        if self.history is None:
+            self.history = BoardHistory(MAX_CHECKPOINTS)
+        self.history.save(self.cells, (self.score, self.moves_left, self.moves_made,
+                                       pack_rng(self.rng)))
+        return len(self.history)
+
+    def rollback(self):
+        """Volta ao último checkpoint e o descarta."""
+        if not self.history:
+            raise ProtocolError("partida sem checkpoint")
+        state = self.history.restore(self.cells)
+        self.score, self.moves_left, self.moves_made, rng_state = state
+        restore_rng(self.rng, rng_state)
+        return len(self.history)
+
+    def summary(self):
+        return {
+            "seed": self.seed, "level": self.level, "rows": self.rows, "cols": self.cols,
+            "score": self.score, "moves_left": self.moves_left,
+            "target_score": self.target_score, "game_over": self.game_over,
+            "won": self.game_over and self.score >= self.target_score,
+        }
+
+
+def encode_steps(steps):
+    """Linha do tempo em JSON: os mesmos campos de CascadeStep, só com listas."""
+    return [{
+        "matches": sorted(step.matches),
+        "score_gain": step.score_gain,
+        "falling_moves": step.falling_moves,
+        "new_pieces": step.new_pieces,
+    } for step in steps]
+
+
+# --- Servidor ---
+class SessionServer:
+    """Tabela de partidas e interpretação dos pedidos (independe do transporte)."""
+
+    def __init__(self, max_games=MAX_GAMES, levels_path=DEFAULT_PACK):
+        self.games = {}
+        self.levels_path = levels_path
+        self.max_games = max_games
+        self.next_id = 1
+        self.moves = 0
+        self.requests = 0
+
+    def handle(self, request):
+        """Pedido (dict) -> resposta (dict). Nunca levanta erro de protocolo."""
+        self.requests += 1
+        response = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+        try:
+            if not isinstance(request, dict):
+                raise ProtocolError("o pedido deve ser um objeto JSON")
+            command = getattr(self, "cmd_" + str(request.get("cmd")), None)
+            if command is None:
+                raise ProtocolError(f"comando desconhecido: {request.get('cmd')!r}")
+            response.update(command(request))
+            response["ok"] = True
+        except (ProtocolError, KeyError, TypeError, ValueError, OverflowError) as error:
+            if isinstance(error, KeyError):
+                error = f"campo ausente ou inválido: {error}"
+            response["ok"] = False
+            response["error"] = str(error)
+        return response
+
+    def _game(self, request):
+        game = self.games.get(request.get("game"))
+        if game is None:
+            raise ProtocolError(f"partida inexistente: {request.get('game')!r}")
+        return game
+
+    def cmd_new(self, request):
+        if len(self.games) >= self.max_games:
+            raise ProtocolError("limite de partidas atingido")
+        if "level" in request:
+            level = int_field(request["level"], "level", 1, MAX_LEVEL)
+            return self._add(GameSession(level=get_level(level, self.levels_path)))
+        rows = int_field(request.get("rows", GRID_ROWS), "rows", 3, MAX_GRID)
+        cols = int_field(request.get("cols", GRID_COLS), "cols", 3, MAX_GRID)
+        seed = request.get("seed")
+        refill = request.get("refill", REFILL_STRATEGY)
+        if refill not in REFILL_STRATEGIES:
+            raise ProtocolError(f"estratégia de reposição desconhecida: {refill!r}")
+        game = GameSession(
+            None if seed is None else int_field(seed, "seed", 0, MAX_SEED), rows, cols,
+            int_field(request.get("moves", STARTING_MOVES), "moves", 1, MAX_MOVES),
+            int_field(request.get("target", TARGET_SCORE), "target", 0, MAX_TARGET),
+            refill)
+        return self._add(game)
+
+    def _add(self, game):
+        game_id = self.next_id
+        self.next_id += 1
+        self.games[game_id] = game
+        return {"game": game_id, "board": game.board(), **game.summary()}
+
+    def cmd_swap(self, request):
+        game = self._game(request)
+        pos1, pos2 = self._cell(request, "from"), self._cell(request, "to")
+        valid, steps, reshuffled = game.swap(pos1, pos2)
+        if valid:
+            self.moves += 1
+        response = {"valid": valid, "steps": encode_steps(steps),
+                    "score": game.score, "moves_left": game.moves_left,
+                    "game_over": game.game_over}
+        if reshuffled is not None:
+            response["reshuffled"] = reshuffled  # Tabuleiro antes da troca
+        return response
+
+    @staticmethod
+    def _cell(request, name):
+        cell = request[name]
+        if not isinstance(cell, (list, tuple)) or len(cell) != 2:
+            raise ProtocolError("casas são pares [linha, coluna]")
+        return tuple(int_field(value, name, 0, MAX_GRID - 1) for value in cell)
+
+    def cmd_board(self, request):
+        game = self._game(request)
+        return {"board": game.board(), **game.summary()}
+
+    def cmd_close(self, request):
+        game = self._game(request)
+        del self.games[request["game"]]
+        return game.summary()
+
+    def cmd_checkpoint(self, request):
+        return {"checkpoints": self._game(request).checkpoint()}
+
+    def cmd_rollback(self, request):
+        game = self._game(request)
+        checkpoints = game.rollback()
+        return {"board": game.board(), "checkpoints": checkpoints, **game.summary()}
+
+    def cmd_stats(self, request):
+        return {"games": len(self.games), "moves": self.moves, "requests": self.requests}
+
+    # --- Transportes ---
+    async def serve_stream(self, reader, writer):
+        """Uma conexão: lê pedidos linha a linha e responde na mesma ordem."""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"id": null, "ok": false, "error": "pedido grande demais"}\n')
+                    break
+                if not line:
+                    break
+                writer.write(self.handle_line(line))
+                # Só espera o buffer esvaziar quando o cliente não lê a tempo
+                if writer.transport.get_write_buffer_size() > MAX_LINE:
+                    await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def handle_line(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {"id": None, "ok": False, "error": "JSON inválido"}
+        except RecursionError:
+            response = {"id": None, "ok": False, "error": "JSON aninhado demais"}
+        else:
+            response = self.handle(request)
+        return json.dumps(response, separators=(",", ":")).encode() + b"\n"
+
+    async def serve_stdin(self):
+        out = sys.stdout.buffer
+        if stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode):
+            # Arquivo redirecionado (< pedidos.jsonl): o laço de eventos só
+            # lê de pipes e soquetes, e um arquivo nunca bloqueia
+            for line in sys.stdin.buffer:
+                if line.strip():
+                    out.write(self.handle_line(line))
+            out.flush()
+            return
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=MAX_LINE)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                out.write(self.handle_line(line))
+                out.flush()
+
+
+async def run(args):
+    server = SessionServer(args.max_games, args.levels)
+    if args.stdin:
+        await server.serve_stdin()
+        return
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)  # Sobra de uma execução anterior
+        listener = await asyncio.start_unix_server(server.serve_stream, args.socket,
+                                                   limit=MAX_LINE)
+        where = args.socket
+    else:
+        listener = await asyncio.start_server(server.serve_stream, args.host, args.port,
+                                              limit=MAX_LINE)
+        where = f"{args.host}:{args.port}"
+    print(f"servidor em {where}", file=sys.stderr, flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de partidas do CalculoCrush")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--socket", help="caminho de um soquete Unix local")
+    transport.add_argument("--port", type=int, help="porta TCP (padrão: 8765)")
+    transport.add_argument("--stdin", action="store_true",
+                           help="lê pedidos da entrada padrão e responde na saída")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--max-games", type=int, default=MAX_GAMES)
+    parser.add_argument("--levels", default=DEFAULT_PACK, help="pacote de níveis")
+    args = parser.parse_args(argv)
+    if not args.stdin and not args.socket and args.port is None:
+        args.port = 8765
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# --- Simulador em Lote (sem janela) ---
+# Joga milhares de partidas com o motor puro (engine.py) para calibrar
+# STARTING_MOVES e TARGET_SCORE. Exemplo:
+#   python simulate.py --games 5000 --policy greedy --moves 20 --target 300
+import argparse
+import json
+import random
+import statistics
+
+from engine import (
+    GRID_COLS, GRID_ROWS, REFILL_STRATEGY, STARTING_MOVES, TARGET_SCORE, MoveIndex,
+    apply_swap, create_board, find_matches_incremental, new_game_rng, shuffle_board,
+    swap_pieces,
+)
+from profiler import percentile
+from refill import REFILL_STRATEGIES
+from solver import Solver
+
+# --- Políticas ---
+# Uma política recebe (board, move_index, rng) e devolve a troca escolhida,
+# ou None se não houver jogada.
+
+def random_policy(board, move_index, rng):
+    moves = move_index.valid_moves()
+    return rng.choice(moves) if moves else None
+
+def greedy_policy(board, move_index, rng):
+    """Escolhe a troca cujo primeiro combo vale mais (pontuação de remove_pieces)."""
+    best_move = None
+    best_gain = -1
+    for pos1, pos2 in move_index.valid_moves():
+        swap_pieces(board, pos1, pos2)
+        matches = find_matches_incremental(board, (pos1, pos2))
+        gain = sum(board[r][c] for r, c in matches)
+        swap_pieces(board, pos1, pos2)
+        if gain > best_gain:
+            best_move, best_gain = (pos1, pos2), gain
+    return best_move
+
+def hint_policy(board, move_index, rng):
+    """Joga sempre a primeira dica, como o botão "Dica" (mesma ordem de find_hint)."""
+    moves = move_index.valid_moves()
+    return moves[0] if moves else None
+
+# O bot busca sempre até a mesma profundidade, sem orçamento de tempo: com
+# relógio, a mesma semente daria partidas diferentes a cada execução
+LOOKAHEAD_DEPTH = 2
+_lookahead_solver = None
+
+def set_lookahead_depth(depth):
+    global LOOKAHEAD_DEPTH, _lookahead_solver
+    LOOKAHEAD_DEPTH = depth
+    _lookahead_solver = None
+
+def lookahead_policy(board, move_index, rng):
+    """Bot de playtest: melhor lance do Solver (busca à frente com cascatas)."""
+    global _lookahead_solver
+    if _lookahead_solver is None:
+        _lookahead_solver = Solver(LOOKAHEAD_DEPTH, time_budget=float("inf"))
+    return _lookahead_solver.best_move(board)
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "hint": hint_policy,
+    "lookahead": lookahead_policy,
+}
+
+# --- Partidas ---
+def play_game(policy, rows=GRID_ROWS, cols=GRID_COLS,
+              starting_moves=STARTING_MOVES, target_score=TARGET_SCORE, rng=None,
+              numbers=None, refill=None, board=None):
+    """
+    Joga uma partida completa e devolve um resumo (dict).
+    'numbers' é a distribuição de peças (padrão: EASY_NUMBERS_LIST),
+    'refill' a estratégia de reposição (padrão: a do nível, REFILL_STRATEGY)
+    e 'board' um tabuleiro inicial fixo (copiado; padrão: sorteado).
+    O mesmo 'rng' sorteia as peças e alimenta a política.
+    """
+    refill = refill or REFILL_STRATEGIES[REFILL_STRATEGY]
+    rng = rng or random.Random()
+    if board is None:
+        board = create_board(rows, cols, numbers, rng)
+    else:
+        board = [list(row) for row in board]
+    move_index = MoveIndex(board)
+    score = 0
+    moves_left = starting_moves
+    cascade_depths = []
+    reshuffles = 0
+    stalled = False
+
+    while moves_left > 0:
+        # Sem jogadas válidas o jogo embaralha, como no main.py
+        if not move_index.has_moves():
+            if not shuffle_board(board, numbers, rng):
+                stalled = True  # Nem embaralhando: o jogo trava
+                break
+            move_index.rebuild()
+            reshuffles += 1
+        move = policy(board, move_index, rng)
+        if move is None:
+            stalled = True
+            break
+        pos1, pos2 = move
+        moves_left -= 1
+        score_gain, depth = apply_swap(board, pos1, pos2, move_index, numbers, rng, refill)
+        score += score_gain
+        cascade_depths.append(depth)
+
+    return {
+        "score": score,
+        "won": score >= target_score,
+        "moves_used": starting_moves - moves_left,
+        "stalled": stalled,
+        "reshuffles": reshuffles,
+        "cascade_depths": cascade_depths,
+    }
+
+def summarize(results):
+    scores = [r["score"] for r in results]
+    depths = [d for r in results for d in r["cascade_depths"]]
+    return {
+        "games": len(results),
+        "win_rate": sum(r["won"] for r in results) / len(results),
+        "stall_rate": sum(r["stalled"] for r in results) / len(results),
+        "reshuffles_mean": statistics.fmean(r["reshuffles"] for r in results),
+        "score_mean": statistics.fmean(scores),
+        "score_median": statistics.median(scores),
+        "score_p10": percentile(scores, 10),
+        "score_p90": percentile(scores, 90),
+        "cascade_depth_mean": statistics.fmean(depths) if depths else 0.0,
+        "cascade_depth_max": max(depths, default=0),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador em lote do CalculoCrush")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rows", type=int, default=GRID_ROWS)
+    parser.add_argument("--cols", type=int, default=GRID_COLS)
+    parser.add_argument("--moves", type=int, default=STARTING_MOVES)
+    parser.add_argument("--target", type=int, default=TARGET_SCORE)
+    parser.add_argument("--refill", choices=sorted(REFILL_STRATEGIES), default=REFILL_STRATEGY,
+                        help="estratégia de reposição das peças novas")
+    parser.add_argument("--depth", type=int, default=LOOKAHEAD_DEPTH,
+                        help="profundidade da busca da política lookahead")
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args(argv)
+    set_lookahead_depth(args.depth)
+
+    _, rng = new_game_rng(args.seed)
+    policy = POLICIES[args.policy]
+    results = [
+        play_game(policy, args.rows, args.cols, args.moves, args.target, rng,
+                  refill=REFILL_STRATEGIES[args.refill])
+        for _ in range(args.games)
+    ]
+    summary = summarize(results)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for key, value in summary.items():
+            print(f"{key:>20}: {value}")
+
+if __name__ == "__main__":
+    main()
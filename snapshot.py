@@ -0,0 +1,146 @@
+# --- Instantâneos do Tabuleiro ---
+# Guardar o tabuleiro inteiro a cada passo (uma lista de listas nova por
+# jogada) faz a memória crescer com o tamanho da grade vezes o número de
+# passos. Aqui ficam duas formas de guardar só o que mudou:
+#   - BoardJournal: diário de desfazer para a busca do solver. Cada casa
+#     alterada anota (índice, valor antigo) antes de mudar; rollback() volta
+#     até a última marca. Um nó da busca custa o que a jogada mexeu, não o
+#     tabuleiro inteiro.
+#   - BoardHistory: pilha limitada de estados salvos (desfazer do jogo,
+#     checkpoints do servidor). Guarda uma cópia compacta do último estado e,
+#     para cada estado salvo, só as casas que mudaram desde o anterior
+#     (delta reverso). Cheia, esquece o estado mais antigo.
+# Os valores ficam em array("H") (2 bytes por casa), como no server.py.
+from array import array
+from collections import deque
+
+MAX_UNDO = 32  # Estados guardados pelo desfazer do jogo
+
+
+# --- Gerador da partida ---
+# O estado do random.Random são 625 inteiros de 32 bits; como tupla de ints
+# do Python ocupa ~20 KB, empacotado num array ocupa 2,5 KB.
+def pack_rng(rng):
+    version, internal, gauss_next = rng.getstate()
+    return version, array("I", internal), gauss_next
+
+def restore_rng(rng, packed):
+    version, internal, gauss_next = packed
+    rng.setstate((version, tuple(internal), gauss_next))
+
+
+# --- Diário de desfazer (solver) ---
+class BoardJournal:
+    """
+    Registra as alterações feitas em 'board' (lista de listas) para poder
+    desfazê-las. mark() abre um ponto de retorno; rollback() desfaz tudo o
+    que veio depois da última marca e a remove.
+    """
+
+    __slots__ = ("board", "cols", "cells", "olds", "marks")
+
+    def __init__(self, board):
+        self.board = board
+        self.cols = len(board[0])
+        self.cells = array("I")  # Índice linha * colunas + coluna
+        self.olds = array("H")   # Valor da casa antes da alteração
+        self.marks = []
+
+    def mark(self):
+        self.marks.append(len(self.cells))
+
+    def record(self, cells):
+        """Anota o valor atual de 'cells' antes de o chamador mudá-las."""
+        board = self.board; cols = self.cols
+        for r, c in cells:
+            self.cells.append(r * cols + c)
+            self.olds.append(board[r][c])
+
+    def swap(self, pos1, pos2):
+        self.record((pos1, pos2))
+        (r1, c1), (r2, c2) = pos1, pos2
+        board = self.board
+        board[r1][c1], board[r2][c2] = board[r2][c2], board[r1][c1]
+
+    def record_drop(self, falling_moves):
+        """
+        Anota uma queda (drop_pieces) já feita. Cada peça escreveu o destino
+        (que estava vazio) e depois zerou a origem, nessa ordem; desfazer na
+        ordem inversa também vale quando um destino é a origem de outra peça.
+        """
+        cols = self.cols
+        for number, (r1, c1), (r2, c2) in falling_moves:
+            self.cells.append(r2 * cols + c2)
+            self.olds.append(0)
+            self.cells.append(r1 * cols + c1)
+            self.olds.append(number)
+
+    def rollback(self):
+        start = self.marks.pop()
+        board = self.board; cols = self.cols
+        cells = self.cells; olds = self.olds
+        for i in range(len(cells) - 1, start - 1, -1):
+            r, c = divmod(cells[i], cols)
+            board[r][c] = olds[i]
+        del cells[start:]
+        del olds[start:]
+
+    def __len__(self):
+        return len(self.cells)
+
+
+# --- Histórico limitado (desfazer, checkpoints) ---
+class BoardHistory:
+    """
+    Pilha de estados salvos de um tabuleiro, com até 'max_depth' níveis.
+    save() guarda o tabuleiro e um 'extra' qualquer (pontos, movimentos,
+    gerador...); restore() escreve no tabuleiro o último estado salvo, tira
+    ele da pilha e devolve o 'extra' dele. O tabuleiro pode ser lista de
+    listas ou já achatado num array("H") (as casas do server.py).
+    """
+
+    __slots__ = ("cols", "_shadow", "_deltas")
+
+    def __init__(self, max_depth=MAX_UNDO):
+        self.cols = 0
+        self._shadow = None  # Último estado salvo, achatado
+        # (índices, valores do estado anterior, extra) por estado salvo
+        self._deltas = deque(maxlen=max_depth)
+
+    def save(self, board, extra=None):
+        if isinstance(board, array):
+            cells = array("H", board)
+        else:
+            cells = array("H", [number for row in board for number in row])
+            self.cols = len(board[0])
+        shadow = self._shadow
+        if shadow is None or len(shadow) != len(cells):
+            indices, olds = array("I"), array("H")
+        else:
+            indices = array("I", [i for i, (old, new) in enumerate(zip(shadow, cells))
+                                  if old != new])
+            olds = array("H", [shadow[i] for i in indices])
+        self._deltas.append((indices, olds, extra))
+        self._shadow = cells
+
+    def restore(self, board):
+        """Volta 'board' ao último estado salvo. Retorna o 'extra' dele."""
+        if not self._deltas:
+            raise IndexError("nada para desfazer")
+        shadow = self._shadow; cols = self.cols
+        if isinstance(board, array):
+            board[:] = shadow
+        else:
+            for r, row in enumerate(board):
+                row[:] = shadow[r * cols:(r + 1) * cols]
+        indices, olds, extra = self._deltas.pop()
+        for i, old in zip(indices, olds):
+            shadow[i] = old
+        return extra
+
+    def clear(self):
+        self._shadow = None
+        self._deltas.clear()
+
+    def __len__(self):
+        return len(self._deltas)
@@ -0,0 +1,230 @@
+# --- Solver (busca à frente) ---
+# Procura a troca que rende mais pontos olhando N jogadas adiante.
+# As peças novas de uma reposição são sorteadas, então a busca não as
+# conhece: casas reabastecidas viram buracos (0), que nunca combinam.
+# Só contam os pontos certos — combinações e cascatas formadas pelas peças
+# que já estão no tabuleiro, com a pontuação de remove_pieces.
+# Posições repetidas são podadas por uma tabela de transposição (LRU).
+# A busca joga e desfaz num tabuleiro só (snapshot.BoardJournal): cada nó
+# custa as casas que a jogada mexeu, não uma cópia do tabuleiro.
+
+import time
+from collections import OrderedDict
+
+from engine import drop_pieces, find_matches_incremental, remove_pieces, swap_pieces
+from snapshot import BoardJournal
+from worker import LatestOnlyWorker
+
+DEFAULT_DEPTH = 2
+DEFAULT_TIME_BUDGET = 0.05   # Segundos por jogada
+DEFAULT_CACHE_SIZE = 200_000
+
+
+class SearchTimeout(Exception):
+    """O orçamento de tempo acabou no meio de uma profundidade."""
+
+
+def board_key(board):
+    """Chave compacta e hashável do tabuleiro (os valores cabem em um byte)."""
+    return bytes(value for row in board for value in row)
+
+def resolve_known_cascade(board, matches, journal=None):
+    """
+    Cascata sem reposição: remove, deixa cair e procura de novo, com os
+    buracos no lugar das peças novas. Retorna os pontos ganhos. Com
+    'journal' (BoardJournal do tabuleiro), as alterações ficam anotadas.
+    """
+    total_score_gain = 0
+    while matches:
+        if journal is not None:
+            journal.record(matches)
+        total_score_gain += remove_pieces(board, matches)
+        falling_moves = drop_pieces(board)
+        if journal is not None:
+            journal.record_drop(falling_moves)
+        matches = find_matches_incremental(board, [to_pos for _, _, to_pos in falling_moves])
+    return total_score_gain
+
+def candidate_moves(board, deadline=None):
+    """
+    Trocas válidas entre duas peças (buracos não entram na busca). Com
+    'deadline' (perf_counter), levanta SearchTimeout se ele passar.
+    """
+    rows = len(board); cols = len(board[0])
+    moves = []
+    for r in range(rows):
+        # Num tabuleiro grande, só a lista de trocas já pode estourar o orçamento
+        if deadline is not None and time.perf_counter() > deadline:
+            raise SearchTimeout()
+        for c in range(cols):
+            if board[r][c] == 0:
+                continue
+            for pos2 in ((r, c + 1), (r + 1, c)):
+                r2, c2 = pos2
+                if r2 >= rows or c2 >= cols or board[r2][c2] == 0:
+                    continue
+                swap_pieces(board, (r, c), pos2)
+                matches = find_matches_incremental(board, ((r, c), pos2))
+                swap_pieces(board, (r, c), pos2)
+                if matches:
+                    moves.append(((r, c), pos2))
+    return moves
+
+
+class Solver:
+    """
+    Busca em profundidade com aprofundamento iterativo: completa a
+    profundidade 1, depois 2, ... até 'depth' ou até estourar o orçamento de
+    tempo, e devolve o melhor lance da última profundidade completa.
+    """
+
+    def __init__(self, depth=DEFAULT_DEPTH, time_budget=DEFAULT_TIME_BUDGET,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        self.depth = depth
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # (chave do tabuleiro, profundidade) -> valor
+        self.nodes = 0
+        self._deadline = None
+
+    def _cache_get(self, key):
+        value = self.cache.get(key)
+        if value is not None:
+            self.cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, key, value):
+        self.cache[key] = value
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _play(self, journal, move):
+        """
+        Abre uma marca no diário, joga 'move' e resolve a cascata conhecida.
+        Retorna os pontos; journal.rollback() devolve o tabuleiro.
+        """
+        board = journal.board
+        journal.mark()
+        journal.swap(*move)
+        return resolve_known_cascade(board, find_matches_incremental(board, move), journal)
+
+    def _value(self, journal, depth):
+        """Melhor soma de pontos alcançável em 'depth' jogadas a partir de 'board'."""
+        if depth == 0:
+            return 0
+        board = journal.board
+        key = (board_key(board), depth)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        self.nodes += 1
+        best = 0
+        for move in candidate_moves(board, self._deadline):
+            gain = self._play(journal, move)
+            best = max(best, gain + self._value(journal, depth - 1))
+            journal.rollback()
+        self._cache_put(key, best)
+        return best
+
+    def search(self, board, depth=None, time_budget=None):
+        """
+        Retorna (melhor troca, pontos esperados, profundidade completa).
+        O orçamento de tempo conta desde a chamada. A troca é None se não
+        houver jogada válida ou se o tempo acabar antes de achar uma; se ele
+        acabar no meio da profundidade 1, vale o melhor lance visto até ali
+        (profundidade completa 0).
+        """
+        depth = depth or self.depth
+        time_budget = self.time_budget if time_budget is None else time_budget
+        self._deadline = time.perf_counter() + time_budget
+        try:
+            return self._search(board, depth)
+        finally:
+            self._deadline = None
+
+    def _search(self, board, depth):
+        board = [list(row) for row in board]
+        try:
+            moves = candidate_moves(board, self._deadline)
+        except SearchTimeout:
+            return None, 0, 0
+        if not moves:
+            return None, 0, 0
+        journal = BoardJournal(board)
+
+        # Profundidade 1: o primeiro lance sempre entra (é a garantia de ter
+        # uma resposta), os outros enquanto houver tempo
+        scored = []
+        for move in moves:
+            if scored and time.perf_counter() > self._deadline:
+                gain, move = max(scored, key=lambda item: item[0])
+                return move, gain, 0
+            scored.append((self._play(journal, move), move))
+            journal.rollback()
+        scored.sort(key=lambda item: -item[0])
+        best_value, best_move = scored[0][0], scored[0][1]
+        completed = 1
+
+        try:
+            for current in range(2, depth + 1):
+                results = []
+                for gain, move in scored:
+                    # Os filhos da raiz não ficam guardados: jogar de novo
+                    # custa pouco perto da busca embaixo deles
+                    self._play(journal, move)
+                    value = gain + self._value(journal, current - 1)
+                    journal.rollback()
+                    results.append((value, gain, move))
+                results.sort(key=lambda item: -item[0])
+                best_value, best_move = results[0][0], results[0][2]
+                # Os melhores lances desta profundidade abrem a próxima
+                scored = [(gain, move) for _, gain, move in results]
+                completed = current
+        except SearchTimeout:
+            pass
+        return best_move, best_value, completed
+
+    def best_move(self, board, depth=None, time_budget=None):
+        return self.search(board, depth, time_budget)[0]
+
+
+# --- Execução em segundo plano ---
+# O solver nunca roda na thread da interface: pede-se um lance e recebe-se
+# um Future, consultado a cada quadro com future.done().
+
+_process_solver = None
+
+def _solve_in_process(board, depth, time_budget, cache_size):
+    # Um Solver por processo: a tabela de transposição sobrevive entre pedidos
+    global _process_solver
+    if _process_solver is None or _process_solver.cache_size != cache_size:
+        _process_solver = Solver(depth, time_budget, cache_size)
+    return _process_solver.search(board, depth, time_budget)
+
+
+class BackgroundSolver(LatestOnlyWorker):
+    """
+    Roda o Solver numa thread (padrão) ou num processo separado.
+    Um pedido novo cancela o anterior, se ele ainda não tiver começado.
+    """
+
+    def __init__(self, depth=DEFAULT_DEPTH, time_budget=DEFAULT_TIME_BUDGET,
+                 cache_size=DEFAULT_CACHE_SIZE, use_process=False):
+        self.depth = depth
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self.use_process = use_process
+        super().__init__(use_process)
+        if not use_process:
+            self._solver = Solver(depth, time_budget, cache_size)
+
+    def request(self, board):
+        """Agenda a busca numa cópia de 'board'. Retorna um Future de search()."""
+        board = [list(row) for row in board]
+        if self.use_process:
+            return self._submit(_solve_in_process, board, self.depth,
+                                self.time_budget, self.cache_size)
+        return self._submit(self._solver.search, board, self.depth, self.time_budget)
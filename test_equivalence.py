@@ -0,0 +1,180 @@
+# --- Testes de Equivalência ---
+# As versões rápidas (busca incremental, MoveIndex, BitBoard, ArrayBoard,
+# histórico por deltas) têm que dar o mesmo resultado das versões simples,
+# que servem de referência. Tabuleiros sorteados com semente fixa:
+#   python -m pytest -q test_equivalence.py
+import random
+from array import array
+
+import pytest
+
+import engine
+from bitboard import BitBoard, Codec
+from engine import (
+    EASY_NUMBERS_LIST, SETTLED_BOARD_CELLS, ArrayBoard, MoveIndex, _full_scan_through,
+    apply_swap_events, create_board, drop_pieces, find_hint, find_matches,
+    find_matches_incremental, is_swap_valid, remove_pieces, swap_pieces,
+)
+from levels import load_levels
+from snapshot import BoardHistory, BoardJournal
+
+SEEDS = range(20)
+# Poucos valores com muitos produtos entre si: trincas aparecem a toda hora
+DENSE_NUMBERS = (1, 2, 3, 4, 6, 8, 12)
+
+
+def random_board(rng, rows, cols, numbers=DENSE_NUMBERS):
+    return [[rng.choice(numbers) for _ in range(cols)] for _ in range(rows)]
+
+def all_swaps(rows, cols):
+    for r in range(rows):
+        for c in range(cols):
+            if c < cols - 1:
+                yield (r, c), (r, c + 1)
+            if r < rows - 1:
+                yield (r, c), (r + 1, c)
+
+def brute_force_moves(board):
+    return sorted((pos1, pos2) for pos1, pos2 in all_swaps(len(board), len(board[0]))
+                  if is_swap_valid(board, pos1, pos2))
+
+def play_random_swaps(board, rng, count, move_index=None, numbers=DENSE_NUMBERS):
+    rows, cols = len(board), len(board[0])
+    swaps = list(all_swaps(rows, cols))
+    for _ in range(count):
+        pos1, pos2 = rng.choice(swaps)
+        apply_swap_events(board, pos1, pos2, move_index, numbers, rng)
+
+
+# --- Busca incremental ---
+@pytest.mark.parametrize("seed", SEEDS)
+def test_incremental_matches_full_scan(seed):
+    rng = random.Random(seed)
+    board = random_board(rng, 9, 11)
+    for _ in range(50):
+        changed = [(rng.randrange(9), rng.randrange(11)) for _ in range(rng.randint(1, 6))]
+        assert find_matches_incremental(board, changed) == _full_scan_through(board, changed)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_incremental_matches_find_matches_on_settled_board(seed):
+    rng = random.Random(seed)
+    board = create_board(40, 40, rng=rng)
+    assert len(board) * len(board[0]) > SETTLED_BOARD_CELLS
+    assert find_matches(board) == set()
+    for pos1, pos2 in rng.sample(list(all_swaps(40, 40)), 30):
+        swap_pieces(board, pos1, pos2)
+        assert find_matches_incremental(board, (pos1, pos2)) == find_matches(board)
+        swap_pieces(board, pos1, pos2)
+
+
+# --- MoveIndex ---
+@pytest.mark.parametrize("seed", SEEDS)
+def test_move_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    board = random_board(rng, 8, 8)
+    index = MoveIndex(board)
+    assert index.valid_moves() == brute_force_moves(board)
+    for _ in range(10):
+        play_random_swaps(board, rng, 1, index)
+        assert index.valid_moves() == brute_force_moves(board)
+        assert index.has_moves() == bool(index.valid_moves())
+
+
+# --- BitBoard ---
+# Codecs das distribuições dos primeiros níveis do pacote
+LEVEL_NUMBERS = [level.numbers for level in load_levels()[:5]]
+
+@pytest.mark.parametrize("numbers", [EASY_NUMBERS_LIST, DENSE_NUMBERS] + LEVEL_NUMBERS)
+def test_bitboard_matches_list_board(numbers):
+    codec = Codec(numbers)
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        board = random_board(rng, 7, 10, numbers)
+        bitboard = BitBoard.from_board(board, codec)
+        assert bitboard.to_board() == board
+        assert bitboard.find_matches() == find_matches(board)
+        assert bitboard.valid_moves() == brute_force_moves(board)
+        assert bitboard.find_hint() == find_hint(board)
+        # Depois de mudar casas soltas, as máscaras continuam certas
+        for _ in range(15):
+            r, c = rng.randrange(7), rng.randrange(10)
+            board[r][c] = rng.choice(numbers)
+            bitboard.set(r, c, board[r][c])
+        assert bitboard.find_matches() == find_matches(board)
+        assert bitboard.valid_moves() == brute_force_moves(board)
+        assert bitboard.find_hint() == find_hint(board)
+
+
+# --- ArrayBoard ---
+@pytest.mark.skipif(engine.np is None, reason="ArrayBoard precisa do NumPy")
+@pytest.mark.parametrize("seed", SEEDS)
+def test_array_board_matches_list_board(seed):
+    rng = random.Random(seed)
+    board = random_board(rng, 9, 7)
+    array_board = ArrayBoard(board, rng=random.Random(seed), numbers=DENSE_NUMBERS)
+    matches = find_matches(board)
+    assert find_matches(array_board) == matches
+    assert remove_pieces(array_board, matches) == remove_pieces(board, matches)
+    assert array_board.to_list() == board
+    assert sorted(drop_pieces(array_board)) == sorted(drop_pieces(board))
+    assert array_board.to_list() == board
+    new_pieces = array_board.refill_board()
+    holes = sorted((r, c) for r, row in enumerate(board) for c, n in enumerate(row) if n == 0)
+    assert sorted(cell for _, cell in new_pieces) == holes
+    assert all(number in DENSE_NUMBERS for number, _ in new_pieces)
+
+
+# --- Histórico e diário ---
+@pytest.mark.parametrize("seed", SEEDS)
+def test_board_history_round_trip(seed):
+    rng = random.Random(seed)
+    board = random_board(rng, 8, 8)
+    history = BoardHistory()
+    saved = []
+    for turn in range(10):
+        history.save(board, turn)
+        saved.append([list(row) for row in board])
+        play_random_swaps(board, rng, 1)
+    for turn in reversed(range(10)):
+        assert history.restore(board) == turn
+        assert board == saved[turn]
+    assert len(history) == 0
+
+def test_board_history_flat_cells_and_depth_limit():
+    rng = random.Random(7)
+    cells = array("H", [rng.choice(DENSE_NUMBERS) for _ in range(64)])
+    history = BoardHistory(max_depth=3)
+    saved = []
+    for turn in range(5):
+        history.save(cells, turn)
+        saved.append(array("H", cells))
+        for _ in range(4):
+            cells[rng.randrange(64)] = rng.choice(DENSE_NUMBERS)
+    # Só os 3 últimos estados continuam guardados
+    for turn in (4, 3, 2):
+        assert history.restore(cells) == turn
+        assert cells == saved[turn]
+    with pytest.raises(IndexError):
+        history.restore(cells)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_board_journal_rollback(seed):
+    rng = random.Random(seed)
+    board = random_board(rng, 8, 8)
+    original = [list(row) for row in board]
+    journal = BoardJournal(board)
+    states = []
+    for pos1, pos2 in rng.sample(list(all_swaps(8, 8)), 6):
+        journal.mark()
+        states.append([list(row) for row in board])
+        journal.swap(pos1, pos2)
+        matches = find_matches_incremental(board, (pos1, pos2))
+        # Como no solver: casas removidas anotadas antes, queda depois
+        journal.record(matches)
+        remove_pieces(board, matches)
+        journal.record_drop(drop_pieces(board))
+    while states:
+        journal.rollback()
+        assert board == states.pop()
+    assert board == original
+    assert len(journal) == 0
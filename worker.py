@@ -0,0 +1,30 @@
+# --- Trabalhador de Fundo ---
+# Base das dicas (hints.py) e do solver (solver.py) em segundo plano: um
+# único trabalhador (thread ou processo) e no máximo um pedido que importa,
+# o mais recente. Um pedido novo cancela o anterior, se ele ainda não tiver
+# começado; shutdown() não espera nada terminar.
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class LatestOnlyWorker:
+    """
+    As subclasses montam o pedido e chamam _submit(); use_process=True roda
+    num processo separado (fn e argumentos precisam ser serializáveis).
+    """
+
+    def __init__(self, use_process=False):
+        executor = ProcessPoolExecutor if use_process else ThreadPoolExecutor
+        self._executor = executor(max_workers=1)
+        self._pending = None
+
+    def _submit(self, fn, *args):
+        """Cancela o pedido pendente e agenda fn(*args). Retorna o Future."""
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = self._executor.submit(fn, *args)
+        return self._pending
+
+    def shutdown(self):
+        if self._pending is not None:
+            self._pending.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)